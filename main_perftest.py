@@ -2,13 +2,15 @@
 
 # import os
 import sys
-import random
+import time
 
 # import networkx
+from nodegraph.node import Node
 from nodegraph.scene import Scene
+from nodegraph.style import StyleCache
 from nodegraph.view import View
 
-from Qt import QtWidgets
+from Qt import QtCore, QtGui, QtWidgets
 
 
 class NodeGraphDialog(QtWidgets.QMainWindow):
@@ -28,17 +30,17 @@ class NodeGraphDialog(QtWidgets.QMainWindow):
         self.setWindowTitle("Node graph -")
 
         # center = self.nodegraph.graph_view.sceneRect().center()
-        for i in range(0, 30):
-            prev_node = None
-            for j in range(0, 40):
-                node = self.nodegraph.graph_scene.create_node(
-                    "random%d%d%d" % (i, j, random.randint(1, 1000)),
-                    inputs=["in", "add"])
-                node.setPos(j * 350, i * 350)
-                if prev_node:
-                    edge = self.nodegraph.graph_scene.create_edge(
-                        prev_node._output, node._inputs[0])
-                prev_node = node
+        scene = self.nodegraph.graph_scene
+        with scene.batch():
+            for i in range(0, 30):
+                nodes = scene.create_nodes(
+                    [{"name": "node_%d_%d" % (i, j),
+                      "inputs": ["in", "add"],
+                      "pos": QtCore.QPointF(j * 350, i * 350)}
+                     for j in range(0, 40)])
+                scene.create_edges(
+                    [(prev_node.outputs[0], node.inputs[0])
+                     for prev_node, node in zip(nodes, nodes[1:])])
 
 
 class NodeGraphWidget(QtWidgets.QWidget):
@@ -60,8 +62,259 @@ class NodeGraphWidget(QtWidgets.QWidget):
         self.horizontal_layout.addWidget(self.graph_view)
 
 
+def benchmark_edge_creation(counts=(1000, 10000, 100000)):
+    """Print the cost of chaining nodes together for growing graph sizes.
+    Time per edge should stay flat as long as edge creation is linear.
+
+    :param counts: Number of edges to create for each run
+    :type counts: tuple
+
+    """
+    for count in counts:
+        scene = Scene()
+        nodes = [scene.create_node("node_%d" % i) for i in range(count + 1)]
+
+        start = time.time()
+        for i in range(count):
+            scene.create_edge(nodes[i].outputs[0], nodes[i + 1].inputs[0])
+        elapsed = time.time() - start
+
+        print("create_edge: %6d edges in %.3fs (%.1fus per edge)"
+              % (count, elapsed, elapsed * 1000000 / count))
+
+
+class UncachedStyleCache(StyleCache):
+
+    """
+    Build brushes and pens from the palette on every call, as items did
+    before sharing a style cache, to compare against it
+
+    """
+
+    def brush(self, role):
+        self._build()
+        return self._brushes[role]
+
+    def pen(self, role, width=1):
+        return QtGui.QPen(self.brush(role), width)
+
+
+def benchmark_paint(rows=20, columns=50, frames=20, edge_layer=False,
+                    style_cache=True):
+    """Print the average cost of painting a node or an edge by rendering a
+    grid of chained nodes offscreen.
+
+    :param rows: Number of node chains
+    :type rows: int
+
+    :param columns: Number of nodes per chain
+    :type columns: int
+
+    :param frames: Number of renders to average
+    :type frames: int
+
+    :param edge_layer: If true, draw edges through the scene edge layer
+    :type edge_layer: bool
+
+    :param style_cache: If false, build brushes and pens on every paint
+    :type style_cache: bool
+
+    """
+    scene = Scene(edge_layer=edge_layer)
+    if not style_cache:
+        scene._style_cache = UncachedStyleCache(scene)
+    for i in range(rows):
+        nodes = scene.create_nodes(
+            [{"name": "node_%d_%d" % (i, j),
+              "inputs": ["in", "add"],
+              "pos": QtCore.QPointF(j * 350, i * 350)}
+             for j in range(columns)])
+        scene.create_edges(
+            [(prev_node.outputs[0], node.inputs[0])
+             for prev_node, node in zip(nodes, nodes[1:])])
+
+    source = scene.itemsBoundingRect()
+    image = QtGui.QImage(1920, 1080, QtGui.QImage.Format_ARGB32_Premultiplied)
+    items = len(scene.items())
+
+    painter = QtGui.QPainter(image)
+    painter.setRenderHint(QtGui.QPainter.Antialiasing)
+    start = time.time()
+    for _ in range(frames):
+        scene.render(painter, QtCore.QRectF(image.rect()), source)
+    elapsed = (time.time() - start) / frames
+    painter.end()
+
+    modes = []
+    if edge_layer:
+        modes.append("edge layer")
+    if not style_cache:
+        modes.append("no style cache")
+    print("paint%s: %d items in %.1fms per frame (%.1fus per item)"
+          % (" (%s)" % ", ".join(modes) if modes else "", items,
+             elapsed * 1000, elapsed * 1000000 / items))
+
+
+def benchmark_edge_paint(count=10000, frames=10):
+    """Print the average cost of a single edge paint call, line and arrow
+    included, for a chain of nodes.
+
+    :param count: Number of edges to paint
+    :type count: int
+
+    :param frames: Number of times every edge is painted
+    :type frames: int
+
+    """
+    scene = Scene()
+    nodes = scene.create_nodes(
+        [{"name": "node_%d" % i,
+          "pos": QtCore.QPointF((i % 100) * 350, (i // 100) * 350)}
+         for i in range(count + 1)])
+    edges = scene.create_edges(
+        [(prev_node.outputs[0], node.inputs[0])
+         for prev_node, node in zip(nodes, nodes[1:])])
+
+    image = QtGui.QImage(512, 512, QtGui.QImage.Format_ARGB32_Premultiplied)
+    option = QtWidgets.QStyleOptionGraphicsItem()
+
+    painter = QtGui.QPainter(image)
+    painter.setRenderHint(QtGui.QPainter.Antialiasing)
+    start = time.time()
+    for _ in range(frames):
+        for edge in edges:
+            edge.paint(painter, option)
+    elapsed = (time.time() - start) / frames
+    painter.end()
+
+    print("edge paint: %d edges in %.1fms per frame (%.1fus per edge)"
+          % (count, elapsed * 1000, elapsed * 1000000 / count))
+
+
+def _send_mouse_event(scene, event_type, pos, press_pos, buttons):
+    """Send a left button mouse event to a scene as a view would
+
+    """
+    event = QtWidgets.QGraphicsSceneMouseEvent(event_type)
+    event.setScenePos(pos)
+    event.setButtonDownScenePos(QtCore.Qt.LeftButton, press_pos)
+    event.setButton(QtCore.Qt.LeftButton)
+    event.setButtons(buttons)
+    QtWidgets.QApplication.sendEvent(scene, event)
+
+
+def benchmark_drag(rows=40, columns=50, frames=60, adaptive_index=True):
+    """Print the frame rate of dragging a whole selected grid of chained
+    nodes, each frame moving the mouse then rendering a view sized area.
+
+    :param rows: Number of node chains
+    :type rows: int
+
+    :param columns: Number of nodes per chain
+    :type columns: int
+
+    :param frames: Number of mouse moves
+    :type frames: int
+
+    :param adaptive_index: Scene adaptive index option
+    :type adaptive_index: bool
+
+    """
+    scene = Scene(adaptive_index=adaptive_index)
+    with scene.batch():
+        for i in range(rows):
+            nodes = scene.create_nodes(
+                [{"name": "node_%d_%d" % (i, j),
+                  "inputs": ["in", "add"],
+                  "pos": QtCore.QPointF(j * 350, i * 350)}
+                 for j in range(columns)])
+            scene.create_edges(
+                [(prev_node.outputs[0], node.inputs[0])
+                 for prev_node, node in zip(nodes, nodes[1:])])
+    scene.select_items(scene.nodes)
+
+    node = scene.nodes[0]
+    press_pos = node.mapToScene(node._label_rect.center())
+    image = QtGui.QImage(1920, 1080, QtGui.QImage.Format_ARGB32_Premultiplied)
+    painter = QtGui.QPainter(image)
+
+    _send_mouse_event(scene, QtCore.QEvent.GraphicsSceneMousePress,
+                      press_pos, press_pos, QtCore.Qt.LeftButton)
+    start = time.time()
+    for frame in range(1, frames + 1):
+        pos = press_pos + QtCore.QPointF(frame * 3, frame * 2)
+        _send_mouse_event(scene, QtCore.QEvent.GraphicsSceneMouseMove,
+                          pos, press_pos, QtCore.Qt.LeftButton)
+        scene.frame_scheduler.flush()
+        source = QtCore.QRectF(pos.x() - 960, pos.y() - 540, 1920, 1080)
+        scene.render(painter, QtCore.QRectF(image.rect()), source)
+    _send_mouse_event(scene, QtCore.QEvent.GraphicsSceneMouseRelease,
+                      pos, press_pos, QtCore.Qt.NoButton)
+    elapsed = time.time() - start
+    painter.end()
+
+    print("drag%s: %d nodes at %.1f fps"
+          % (" (adaptive index)" if adaptive_index else "",
+             rows * columns, frames / elapsed))
+
+
+def benchmark_rect_query(rows=100, columns=100, queries=100):
+    """Print the time of querying nodes within a view sized rectangle,
+    through the geometry store and through the scene index.
+
+    :param rows: Number of node rows
+    :type rows: int
+
+    :param columns: Number of nodes per row
+    :type columns: int
+
+    :param queries: Number of queries
+    :type queries: int
+
+    """
+    scene = Scene()
+    with scene.batch():
+        scene.create_nodes(
+            [{"name": "node_%d_%d" % (i, j),
+              "pos": QtCore.QPointF(j * 350, i * 350)}
+             for i in range(rows) for j in range(columns)])
+
+    rects = [QtCore.QRectF(k * 97, k * 53, 1920, 1080)
+             for k in range(queries)]
+    start = time.time()
+    for rect in rects:
+        [item for item in scene.items(rect,
+                                      QtCore.Qt.IntersectsItemBoundingRect)
+         if isinstance(item, Node)]
+    index_elapsed = time.time() - start
+
+    if scene.geometry is None:
+        print("rect query: %d nodes, index %.3fs, numpy not available"
+              % (rows * columns, index_elapsed))
+        return
+
+    start = time.time()
+    for rect in rects:
+        scene.nodes_in_rect(rect)
+    store_elapsed = time.time() - start
+
+    print("rect query: %d nodes, index %.3fs, geometry store %.3fs"
+          % (rows * columns, index_elapsed, store_elapsed))
+
+
 if __name__ == "__main__":
     app = QtWidgets.QApplication([])
+    if "--benchmark" in sys.argv:
+        benchmark_edge_creation()
+        benchmark_paint(style_cache=False)
+        benchmark_paint()
+        benchmark_paint(edge_layer=True)
+        benchmark_edge_paint()
+        benchmark_drag(adaptive_index=False)
+        benchmark_drag(adaptive_index=True)
+        benchmark_rect_query()
+        sys.exit(0)
+
     dialog = NodeGraphDialog()
     dialog.show()
 
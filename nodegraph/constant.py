@@ -19,6 +19,17 @@ SCENE_HEIGHT = 4000000
 
 DEBUG = False
 
+# Below this level of detail, nodes and edges are drawn by a single layer
+OVERVIEW_LOD = 0.15
+
+# From this many selected nodes, dragging moves them as a single group
+GROUP_MOVE_THRESHOLD = 50
+
+# BSP tree depth tuning, see Scene.tune_bsp_depth
+BSP_ITEMS_PER_LEAF = 8
+BSP_MIN_DEPTH = 5
+BSP_MAX_DEPTH = 18
+
 NODES_COLOR = {
     "read": {"base_color": [100, 200, 100]},
     "camera": {"base_color": [100, 100, 200]},
@@ -16,13 +16,16 @@ Edge definition including:
     * InteractiveEdge
 
 """
-import hashlib
+import math
+
 from Qt import QtCore, QtGui, QtWidgets
 import maya.cmds as cmds
 # cmds.select(clear=True)
 # from constant import DEBUG
+from .constant import OVERVIEW_LOD
 from .polygons import ARROW_STANDARD, ARROW_SLIM
 from .node import NodeSlot
+from .style import StyleCache
 
 
 class Edge(QtWidgets.QGraphicsItem):
@@ -36,7 +39,12 @@ class Edge(QtWidgets.QGraphicsItem):
     ARROW_STANDARD = 1
     ARROW_SLIM = 2
 
-    def __init__(self, source_slot, target_slot, scene, outline=2, arrow=None):
+    # Stroke widths are rounded up to this step so that arrows (and pens)
+    # are only built for a handful of widths
+    WIDTH_STEP = 0.25
+
+    def __init__(self, source_slot, target_slot, scene, outline=2, arrow=None,
+                 edge_id=None):
         """Creates an instance of this class
 
         :param source: Source slot (should be a output one)
@@ -54,6 +62,9 @@ class Edge(QtWidgets.QGraphicsItem):
         :param arrow: Define type of arrow. By default, no arrow is drawn
         :type arrow: int
 
+        :param edge_id: Id of the edge in the scene graph model
+        :type edge_id: int
+
         :returns: An instance of this class
         :rtype: :class:`nodegraph.edge.Edge`
 
@@ -62,25 +73,22 @@ class Edge(QtWidgets.QGraphicsItem):
         scene.addItem(self)
         self._source_slot = source_slot
         self._target_slot = target_slot
+        self._id = edge_id
         self._outline = outline
         self._arrow = arrow
         self._lod = 1
-        self._hash = ("%s.%s >> %s.%s" %
-                      (source_slot.parent._name, source_slot._name,
-                       target_slot.parent._name, target_slot._name))
         self._shape = None
+        self._bbox = None
+        self._margin = 0
         self._line = None
+        self._arrows = {}  # stroke width -> arrow polygon
+        self._is_hovered = False
 
         self.double_click = False
-        # Set tooltip
-        self.setToolTip(self._hash)
-
-        # Hash the hash
-        self._hash = hashlib.sha256(self._hash.encode('utf-8')).hexdigest()
 
-        # Reference hash in nodes slot
-        source_slot.add_edge(self._hash)
-        target_slot.add_edge(self._hash)
+        # Reference edge in nodes slot
+        source_slot.add_edge(self._id)
+        target_slot.add_edge(self._id)
 
         # Settings
         self.setFlags(QtWidgets.QGraphicsItem.ItemIsSelectable)
@@ -96,10 +104,126 @@ class Edge(QtWidgets.QGraphicsItem):
 
     @property
     def hash(self):
-        """Return the unique hash of this edge
+        """Return the unique hash of this edge, which is its model id
 
         """
-        return self._hash
+        return self._id
+
+    @property
+    def name(self):
+        """Return a readable description of this edge
+
+        """
+        return ("%s.%s >> %s.%s" %
+                (self._source_slot.parent._name, self._source_slot._name,
+                 self._target_slot.parent._name, self._target_slot._name))
+
+    @property
+    def id(self):
+        """Return the id of the edge in the scene graph model
+
+        """
+        return self._id
+
+    @property
+    def is_layered(self):
+        """Return True if this edge is drawn by the edge layer of its scene
+        rather than on its own, which is the case unless it is selected,
+        hovered or moved within a group
+
+        """
+        scene = self.scene()
+        return (scene is not None and scene.edge_layer is not None and
+                not self._is_hovered and not self.isSelected() and
+                self.parentItem() is None)
+
+    def _update_visibility(self):
+        """Skip painting of this edge while a scene layer draws it
+
+        """
+        scene = self.scene()
+        self.setFlag(QtWidgets.QGraphicsItem.ItemHasNoContents,
+                     scene.is_overview or self.is_layered)
+        self._update_layer()
+
+    def _update_layer(self):
+        """Let the edge layer collect this edge again and repaint where it
+        lies
+
+        """
+        scene = self.scene()
+        if scene.edge_layer is not None:
+            scene.edge_layer.invalidate(self)
+
+    @classmethod
+    def stroke_width(cls, outline, lod):
+        """Return outline width, never thinner than a pixel at given level
+        of detail
+
+        :param outline: Nominal outline width
+        :type outline: float
+
+        :param lod: Level of detail
+        :type lod: float
+
+        :rtype: float
+
+        """
+        if outline * lod >= 1:
+            return outline
+        step = cls.WIDTH_STEP
+        return math.ceil(1 / (lod * step)) * step
+
+    @classmethod
+    def build_arrow(cls, line, arrow, width):
+        """Return arrow polygon at the middle of a line
+
+        :param line: Line the arrow points along
+        :type line: :class:`QtCore.QLineF`
+
+        :param arrow: Type of arrow
+        :type arrow: int
+
+        :param width: Outline width the arrow is scaled by
+        :type width: float
+
+        :returns: A polygon in line coordinates or None without arrow
+        :rtype: :class:`QtGui.QPolygonF`
+
+        """
+        if arrow & cls.ARROW_STANDARD:
+            polygon = ARROW_STANDARD
+        elif arrow & cls.ARROW_SLIM:
+            polygon = ARROW_SLIM
+        else:
+            return None
+
+        middle = line.pointAt(0.5)
+        matrix = QtGui.QTransform()
+        matrix.translate(middle.x(), middle.y())
+        matrix.rotate(-line.angle())
+        matrix.scale(width, width)
+        return matrix.map(polygon)
+
+    def _stroke_width(self, lod):
+        return self.stroke_width(self._outline, lod)
+
+    def _arrow_polygon(self, width):
+        """Return arrow polygon at the middle of the line, built once per
+        line and stroke width
+
+        :param width: Outline width the arrow is scaled by
+        :type width: float
+
+        :returns: A polygon in item coordinates or None without arrow
+        :rtype: :class:`QtGui.QPolygonF`
+
+        """
+        poly = self._arrows.get(width)
+        if poly is None and self._arrow:
+            poly = self.build_arrow(self._line, self._arrow, width)
+            self._arrows[width] = poly
+        return poly
 
     def _update_line(self):
         """Resolve start and end point from current source and target position
@@ -114,32 +238,23 @@ class Edge(QtWidgets.QGraphicsItem):
         self._line = QtCore.QLineF(start, end)
 
     def _update_path(self):
-        """Build path which drives shape and bounding box
-
-        :returns: A Qt path object
-        :rtype: :class:`QtGui.QPainterPath`
+        """Resolve bounding box from the line end points and stroke margin,
+        the shape is only built when queried
 
         """
-        # Update path
-        width = (1 / self._lod if self._outline * self._lod < 1
-                 else self._outline)
-        norm = self._line.unitVector().normalVector()
-        norm = width * 3 * QtCore.QPointF(norm.x2() - norm.x1(),
-                                          norm.y2() - norm.y1())
-
-        self._shape = QtGui.QPainterPath()
-        poly = QtGui.QPolygonF([self._line.p1() - norm,
-                                self._line.p1() + norm,
-                                self._line.p2() + norm,
-                                self._line.p2() - norm])
-        self._shape.addPolygon(poly)
-        self._shape.closeSubpath()
+        margin = self._margin = self._stroke_width(self._lod) * 3
+        self._bbox = QtCore.QRectF(self._line.p1(),
+                                   self._line.p2()).normalized()
+        self._bbox.adjust(-margin, -margin, margin, margin)
+        self._shape = None
 
     def _update_position(self):
         """Update position to match center of source slot
 
         """
-        self.setPos(self._source_slot.center)
+        parent = self.parentItem()
+        center = self._source_slot.center
+        self.setPos(center if parent is None else parent.mapFromScene(center))
 
     def _update(self):
         """Update internal properties
@@ -154,6 +269,10 @@ class Edge(QtWidgets.QGraphicsItem):
         # Update path
         self._update_path()
 
+        # Update arrow for the last drawn level of detail
+        self._arrows = {}
+        self._arrow_polygon(self._stroke_width(self._lod))
+
     def update(self):
         """Re-implement update of QtGraphicsItem
 
@@ -168,17 +287,26 @@ class Edge(QtWidgets.QGraphicsItem):
         Return a QPainterPath that represents the bounding shape
 
         """
+        if self._shape is None:
+            norm = self._line.unitVector().normalVector()
+            norm = self._margin * QtCore.QPointF(norm.x2() - norm.x1(),
+                                                 norm.y2() - norm.y1())
+
+            self._shape = QtGui.QPainterPath()
+            poly = QtGui.QPolygonF([self._line.p1() - norm,
+                                    self._line.p1() + norm,
+                                    self._line.p2() + norm,
+                                    self._line.p2() - norm])
+            self._shape.addPolygon(poly)
+            self._shape.closeSubpath()
+
         return self._shape
 
     def boundingRect(self):
         """Re-implement bounding box method
 
         """
-        # Update node
-        # self._update()
-
-        # Infer bounding box from shape
-        return self._shape.controlPointRect()
+        return self._bbox
 
     def set_double_click(self, toggle):
         # self.scene().invert_single_edge(self, toggle)
@@ -204,50 +332,34 @@ class Edge(QtWidgets.QGraphicsItem):
         # Update level of detail
         self._lod = option.levelOfDetailFromTransform(painter.worldTransform())
 
-        # Update brush
-        palette = (self.scene().palette() if self.scene()
-                   else option.palette)
-        brush = palette.text()
+        # Drawn by the overview layer in views zoomed out that much
+        scene = self.scene()
+        if (self._lod < OVERVIEW_LOD and scene is not None and
+                scene.overview_layer is not None):
+            return
+
+        # Resolve brush, from the option palette when rendered standalone
+        style = (scene.style_cache if scene is not None
+                 else StyleCache.from_palette(option.palette))
+        role = "text"
         if option.state & QtWidgets.QStyle.State_Selected:
-            if invert_color:
-                color = QtGui.QColor(255, 0, 0)
-                color = color.darker(250)
-                brush.setColor(color)
-            else:
-                brush = palette.highlight()
+            role = "invert_selected" if invert_color else "highlight"
         elif invert_color:
-            color = QtGui.QColor(255, 0, 0)
-            brush.setColor(color)
+            role = "invert"
         elif option.state & QtWidgets.QStyle.State_MouseOver:
-            color = brush.color().darker(250)
-            brush.setColor(color)
+            role = "text_hover"
+        brush = style.brush(role)
 
         # Update unit width
-        width = (1 / self._lod if self._outline * self._lod < 1
-                 else self._outline)
+        width = self._stroke_width(self._lod)
 
         # Draw line
-        painter.setPen(QtGui.QPen(brush, width))
+        painter.setPen(style.pen(role, width))
         painter.drawLine(self._line)
 
         # Draw arrow if needed
-        if self._arrow and self._lod > 0.15:
-            # Construct arrow
-            matrix = QtGui.QTransform()
-            matrix.rotate(-self._line.angle())
-            matrix.scale(width, width)
-
-            if self._arrow & self.ARROW_STANDARD:
-                poly = matrix.map(ARROW_STANDARD)
-            elif self._arrow & self.ARROW_SLIM:
-                poly = matrix.map(ARROW_SLIM)
-
-            v = self._line.unitVector()
-            v = (self._line.length() / 2) * QtCore.QPointF(v.x2() - v.x1(),
-                                                           v.y2() - v.y1())
-            poly.translate(self._line.x1(), self._line.y1())
-            poly.translate(v.x(), v.y())
-
+        if self._arrow and self._lod > OVERVIEW_LOD:
+            poly = self._arrow_polygon(width)
             painter.setPen(QtCore.Qt.NoPen)
             painter.setBrush(brush)
             painter.drawPolygon(poly)
@@ -263,6 +375,47 @@ class Edge(QtWidgets.QGraphicsItem):
 
         return
 
+    def hoverEnterEvent(self, event):
+        """Re-implement hover enter event to only build tooltip when needed
+
+        :param event: Hover event
+        :type event: :class:`QtWidgets.QGraphicsSceneHoverEvent`
+
+        """
+        if not self.toolTip():
+            self.setToolTip(self.name)
+
+        # Draw on its own while hovered
+        self._is_hovered = True
+        self._update_visibility()
+
+        QtWidgets.QGraphicsItem.hoverEnterEvent(self, event)
+
+    def hoverLeaveEvent(self, event):
+        """Re-implement hover leave event to hand the edge back to the edge
+        layer
+
+        :param event: Hover event
+        :type event: :class:`QtWidgets.QGraphicsSceneHoverEvent`
+
+        """
+        self._is_hovered = False
+        self._update_visibility()
+
+        QtWidgets.QGraphicsItem.hoverLeaveEvent(self, event)
+
+    def itemChange(self, change, value):
+        """Re-implement item change to draw selected edges on their own and
+        let the scene track selection
+
+        """
+        if (change == QtWidgets.QGraphicsItem.ItemSelectedHasChanged and
+                self.scene() is not None):
+            self.scene()._on_item_selected(self, self.isSelected())
+            self._update_visibility()
+
+        return QtWidgets.QGraphicsItem.itemChange(self, change, value)
+
     def mouseMoveEvent(self, event):
         """Re-implements mouse move event to avoid unecessaries signals
 
@@ -287,14 +440,29 @@ class Edge(QtWidgets.QGraphicsItem):
             self._source_slot = source_slot
         if target_slot:
             self._target_slot = target_slot
+        self._update_layer()
         self.prepareGeometryChange()
         self.update()
+        self._update_layer()
+
+    def follow_slots(self):
+        """Update edge after its nodes moved, only moving it when both nodes
+        moved together
+
+        """
+        end = self._target_slot.center - self._source_slot.center
+        if end == self._line.p2():
+            self.refresh_position()
+        else:
+            self.refresh()
 
     def refresh_position(self):
         """Updates start position
 
         """
+        self._update_layer()
         self._update_position()
+        self._update_layer()
 
     def is_connected_to(self, nodes):
         """For a given list of nodes, check if edge is connected (bo)
@@ -311,10 +479,13 @@ class Edge(QtWidgets.QGraphicsItem):
             return False
 
 
-class InteractiveEdge(Edge):
+class InteractiveEdge(object):
 
     """Draw an edge where one one the end point is the currrent mouse pos
 
+    It is not a scene item but an overlay drawn by views in their
+    foreground, so that following the mouse never touches the scene index.
+
     """
 
     def __init__(self, source_slot, mouse_pos, scene, outline=2, arrow=None):
@@ -339,45 +510,68 @@ class InteractiveEdge(Edge):
         :rtype: :class:`nodegraph.edge.InteractiveEdge`
 
         """
-        QtWidgets.QGraphicsItem.__init__(self, parent=None)
-        scene.addItem(self)
+        self._scene = scene
         self.double_click = False
         self._source_slot = source_slot
         self._mouse_pos = mouse_pos
         self._outline = outline
         self._arrow = arrow
         self._lod = 1
-        self._shape = None
         self._line = None
-
-        self.setZValue(-10)
+        self._rect = None
 
         # Update line
         self._update()
+        scene.add_overlay(self)
 
-    def _update_line(self):
-        """Re-implement function that updates edge line definition
+    def _update(self):
+        """Update line, in scene coordinates, and the rectangle it covers
 
         """
-        start = QtCore.QPoint(0, 0)
         if self._source_slot.family & NodeSlot.OUTPUT:
-            end = self._mouse_pos - self._source_slot.center
+            self._line = QtCore.QLineF(self._source_slot.center,
+                                       self._mouse_pos)
         else:
-            end = self._source_slot.center - self._mouse_pos
+            self._line = QtCore.QLineF(self._mouse_pos,
+                                       self._source_slot.center)
 
-        self._line = QtCore.QLineF(start, end)
+        # Leave room for the arrow
+        margin = Edge.stroke_width(self._outline, self._lod) * 5
+        self._rect = QtCore.QRectF(self._line.p1(),
+                                   self._line.p2()).normalized()
+        self._rect.adjust(-margin, -margin, margin, margin)
 
-    def _update_position(self):
-        """Re-implement function that updates internal container
+    def rect(self):
+        """Return scene rectangle covered by the overlay
+
+        :rtype: :class:`QtCore.QRectF`
 
         """
-        if self._source_slot.family & NodeSlot.OUTPUT:
-            position = self._source_slot.center
-        else:
-            position = self._mouse_pos
+        return self._rect
 
-        # Update position
-        self.setPos(position)
+    def paint(self, painter, lod):
+        """Draw overlay in scene coordinates
+
+        :param painter: Painter of a view foreground
+        :type painter: :class:`QtGui.QPainter`
+
+        :param lod: Level of detail of the view
+        :type lod: float
+
+        """
+        self._lod = lod
+        style = self._scene.style_cache
+        role = "invert" if self.double_click else "text"
+        width = Edge.stroke_width(self._outline, lod)
+
+        painter.setPen(style.pen(role, width))
+        painter.drawLine(self._line)
+
+        if self._arrow and lod > OVERVIEW_LOD:
+            painter.setPen(QtCore.Qt.NoPen)
+            painter.setBrush(style.brush(role))
+            painter.drawPolygon(Edge.build_arrow(self._line, self._arrow,
+                                                 width))
 
     def refresh(self, mouse_pos, source_slot=None):
         """Updates start/end position and force redraw
@@ -392,5 +586,7 @@ class InteractiveEdge(Edge):
         self._mouse_pos = mouse_pos
         if source_slot:
             self._source_slot = source_slot
-        self.prepareGeometryChange()
-        self.update()
+
+        old_rect = self._rect
+        self._update()
+        self._scene.update_overlay(old_rect, self._rect)
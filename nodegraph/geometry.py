@@ -0,0 +1,243 @@
+# =============================================================================
+# Nodegraph-pyqt
+#
+# Everyone is permitted to copy and distribute verbatim copies of this
+# document, but changing it is not allowed without permissions.
+#
+# For any questions, please contact: dsideb@gmail.com
+#
+# GNU LESSER GENERAL PUBLIC LICENSE (Version 3, 29 June 2007)
+# =============================================================================
+
+"""
+Columnar node geometry including:
+
+    * NodeGeometryStore
+
+NumPy is optional, scenes only keep a store when it can be imported.
+
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+HAS_NUMPY = numpy is not None
+
+
+class NodeGeometryStore(object):
+
+    """
+    Scene rectangles and state flags of many nodes held in NumPy arrays,
+    one row per node, so that whole graph queries run in a single call
+
+    Bounds of visible nodes are not computed here, the scene extent
+    tracker already maintains them.
+
+    Rows are kept packed, removing a node moves the last row in its place.
+
+    """
+
+    VISIBLE = 1
+    SELECTED = 2
+
+    def __init__(self, capacity=1024):
+        """Create an instance of this class
+
+        :param capacity: Number of rows allocated up front
+        :type capacity: int
+
+        """
+        if numpy is None:
+            raise ImportError("NodeGeometryStore requires numpy")
+
+        self._rows = {}  # key -> row
+        self._keys = []  # row -> key
+        self._x = numpy.zeros(capacity)
+        self._y = numpy.zeros(capacity)
+        self._width = numpy.zeros(capacity)
+        self._height = numpy.zeros(capacity)
+        self._flags = numpy.zeros(capacity, dtype=numpy.uint8)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    @property
+    def keys(self):
+        """Return keys in row order
+
+        :rtype: list
+
+        """
+        return list(self._keys)
+
+    @property
+    def x(self):
+        return self._x[:len(self._keys)]
+
+    @property
+    def y(self):
+        return self._y[:len(self._keys)]
+
+    @property
+    def width(self):
+        return self._width[:len(self._keys)]
+
+    @property
+    def height(self):
+        return self._height[:len(self._keys)]
+
+    @property
+    def flags(self):
+        return self._flags[:len(self._keys)]
+
+    def _grow(self):
+        """Double the number of allocated rows
+
+        """
+        capacity = 2 * len(self._x)
+        for name in ("_x", "_y", "_width", "_height", "_flags"):
+            array = getattr(self, name)
+            grown = numpy.zeros(capacity, dtype=array.dtype)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+
+    def update(self, key, x, y, width, height, flags=None):
+        """Add or replace the scene rectangle of a key
+
+        :param key: Owner of the rectangle, i.e. a node
+        :type key: object
+
+        :param flags: Combination of VISIBLE and SELECTED, left unchanged
+            for known keys by default
+        :type flags: int
+
+        """
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self._keys)
+            if row == len(self._x):
+                self._grow()
+            self._rows[key] = row
+            self._keys.append(key)
+            self._flags[row] = 0
+
+        self._x[row] = x
+        self._y[row] = y
+        self._width[row] = width
+        self._height[row] = height
+        if flags is not None:
+            self._flags[row] = flags
+
+    def set_flag(self, key, flag, enabled=True):
+        """Set or unset a flag of a key
+
+        :param key: Known key
+        :type key: object
+
+        :param flag: VISIBLE or SELECTED
+        :type flag: int
+
+        :param enabled: New flag state
+        :type enabled: bool
+
+        """
+        row = self._rows[key]
+        if enabled:
+            self._flags[row] |= flag
+        else:
+            self._flags[row] &= ~flag & 0xFF
+
+    def remove(self, key):
+        """Remove the row of a key, if any
+
+        :param key: Owner of the row
+        :type key: object
+
+        """
+        row = self._rows.pop(key, None)
+        if row is None:
+            return
+
+        last = len(self._keys) - 1
+        if row != last:
+            for array in (self._x, self._y, self._width, self._height,
+                          self._flags):
+                array[row] = array[last]
+            last_key = self._keys[last]
+            self._keys[row] = last_key
+            self._rows[last_key] = row
+        self._keys.pop()
+
+    def clear(self):
+        """Remove all rows
+
+        """
+        self._rows = {}
+        self._keys = []
+
+    def rows(self, keys):
+        """Return row indices of the given keys
+
+        :param keys: Known keys
+        :type keys: list
+
+        :rtype: :class:`numpy.ndarray`
+
+        """
+        rows = self._rows
+        return numpy.fromiter((rows[key] for key in keys), dtype=numpy.intp,
+                              count=len(keys))
+
+    def translate(self, keys, dx, dy):
+        """Offset the rectangles of many keys at once
+
+        :param keys: Known keys
+        :type keys: list
+
+        :param dx: Horizontal offset
+        :type dx: float
+
+        :param dy: Vertical offset
+        :type dy: float
+
+        :returns: Row indices of the keys
+        :rtype: :class:`numpy.ndarray`
+
+        """
+        rows = self.rows(keys)
+        self._x[rows] += dx
+        self._y[rows] += dy
+        return rows
+
+    def _mask(self, flags):
+        """Return boolean mask of rows having all given flags
+
+        """
+        count = len(self._keys)
+        if not flags:
+            return numpy.ones(count, dtype=bool)
+        return (self._flags[:count] & flags) == flags
+
+    def intersecting(self, left, top, right, bottom, flags=0):
+        """Return keys whose rectangle intersects the given one
+
+        :param flags: Only consider rows having all these flags
+        :type flags: int
+
+        :rtype: list
+
+        """
+        x, y = self.x, self.y
+        mask = self._mask(flags)
+        mask &= x <= right
+        mask &= x + self.width >= left
+        mask &= y <= bottom
+        mask &= y + self.height >= top
+
+        keys = self._keys
+        return [keys[row] for row in numpy.flatnonzero(mask)]
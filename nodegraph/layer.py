@@ -0,0 +1,285 @@
+# =============================================================================
+# Nodegraph-pyqt
+#
+# Everyone is permitted to copy and distribute verbatim copies of this
+# document, but changing it is not allowed without permissions.
+#
+# For any questions, please contact: dsideb@gmail.com
+#
+# GNU LESSER GENERAL PUBLIC LICENSE (Version 3, 29 June 2007)
+# =============================================================================
+
+"""
+Layers drawing many scene items in a single paint call including:
+
+    * OverviewLayer
+    * EdgeLayer
+
+"""
+
+from Qt import QtCore, QtGui, QtWidgets
+from .spatial import SlotGrid
+from .constant import OVERVIEW_LOD
+
+
+class OverviewLayer(QtWidgets.QGraphicsItem):
+
+    """
+    Draw all nodes and edges of a scene as batched rectangles and lines,
+    used when zoomed out far enough for details to be irrelevant
+
+    """
+
+    def __init__(self, scene):
+        """Creates an instance of this class
+
+        :param scene: GraphicsScene that holds the nodes and edges
+        :type scene: :class:`nodegraph.scene.Scene`
+
+        :returns: An instance of this class
+        :rtype: :class:`nodegraph.layer.OverviewLayer`
+
+        """
+        QtWidgets.QGraphicsItem.__init__(self, parent=None)
+        scene.addItem(self)
+        self._node_rects = {}  # node -> scene rect
+        self._lines = {}  # edge hash -> scene line
+        self._dirty_nodes = {}  # used as ordered sets
+        self._dirty_edges = {}
+        self._is_stale = True  # collect everything on next paint
+
+        # Never get in the way of mouse interactions
+        self.setAcceptedMouseButtons(QtCore.Qt.NoButton)
+        self.setZValue(-20)
+
+    def refresh(self):
+        """Collect geometry of all nodes and edges again on next paint
+
+        """
+        self._is_stale = True
+        self.update()
+
+    def invalidate(self, nodes=(), edges=()):
+        """Collect geometry of the given items again on next paint
+
+        :param nodes: Added, removed, moved or resized nodes
+        :type nodes: list
+
+        :param edges: Hashes of added, removed or moved edges
+        :type edges: list
+
+        """
+        for node in nodes:
+            self._dirty_nodes[node] = None
+        for ahash in edges:
+            self._dirty_edges[ahash] = None
+        self.update()
+
+    def _collect(self):
+        """Update geometry of items invalidated since last paint
+
+        """
+        scene = self.scene()
+        if self._is_stale:
+            self._is_stale = False
+            self._node_rects = {}
+            self._lines = {}
+            nodes = scene.nodes
+            edges = list(scene.edges_by_hash)
+        else:
+            nodes = self._dirty_nodes
+            edges = self._dirty_edges
+        self._dirty_nodes = {}
+        self._dirty_edges = {}
+
+        for node in nodes:
+            if node.scene() is scene:
+                self._node_rects[node] = node.sceneBoundingRect()
+            else:
+                self._node_rects.pop(node, None)
+
+        edges_by_hash = scene.edges_by_hash
+        for ahash in edges:
+            edge = edges_by_hash.get(ahash)
+            if edge is not None:
+                self._lines[ahash] = edge._line.translated(edge.scenePos())
+            else:
+                self._lines.pop(ahash, None)
+
+    def shape(self):
+        """Re-implement shape method
+        Empty so that the layer is never picked by scene items() queries
+
+        """
+        return QtGui.QPainterPath()
+
+    def boundingRect(self):
+        """Re-implement bounding box method
+        The layer spans the whole scene so that moves never resize it
+
+        """
+        return self.scene().sceneRect()
+
+    def paint(self, painter, option, widget=None):
+        """Re-implement paint method
+        Only views zoomed out below the overview level of detail draw it
+
+        """
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+        if lod >= OVERVIEW_LOD:
+            return
+
+        self._collect()
+        scene = self.scene()
+        style = scene.style_cache
+
+        # Draw edges
+        pen = QtGui.QPen(style.pen("text"))
+        pen.setCosmetic(True)
+        painter.setPen(pen)
+        painter.drawLines(list(self._lines.values()))
+
+        # Draw nodes
+        selected = scene.selected_nodes
+        node_rects = []
+        selected_rects = []
+        for node, rect in self._node_rects.items():
+            if node in selected:
+                selected_rects.append(rect)
+            else:
+                node_rects.append(rect)
+
+        painter.setPen(QtCore.Qt.NoPen)
+        painter.setBrush(style.brush("label"))
+        painter.drawRects(node_rects)
+        painter.setBrush(style.brush("highlight"))
+        painter.drawRects(selected_rects)
+
+
+class EdgeLayer(QtWidgets.QGraphicsItem):
+
+    """
+    Draw all edges of a scene that are neither selected nor hovered, one
+    stroke and one fill per color for the whole exposed area
+
+    Edges stay in the scene for hit testing and selection but do not paint
+    themselves while the layer draws them, see :attr:`Edge.is_layered`.
+    The layer keeps its own grid of layered edges, updated as edges report
+    changes, so painting never queries scene items.
+
+    """
+
+    # Width and height of a grid cell in scene units
+    CELL_SIZE = 1024
+
+    def __init__(self, scene):
+        """Creates an instance of this class
+
+        :param scene: GraphicsScene that holds the edges
+        :type scene: :class:`nodegraph.scene.Scene`
+
+        :returns: An instance of this class
+        :rtype: :class:`nodegraph.layer.EdgeLayer`
+
+        """
+        QtWidgets.QGraphicsItem.__init__(self, parent=None)
+        scene.addItem(self)
+        self._grid = SlotGrid(self.CELL_SIZE)  # edge hash -> scene rect
+        self._edges = {}  # edge hash -> (edge, scene line, scene position)
+        self._dirty_edges = {}  # edge hash -> edge
+        self._is_stale = True  # collect every edge on next paint
+
+        # Never get in the way of mouse interactions, just below edges
+        self.setAcceptedMouseButtons(QtCore.Qt.NoButton)
+        self.setFlag(QtWidgets.QGraphicsItem.ItemUsesExtendedStyleOption)
+        self.setZValue(-11)
+
+    def invalidate(self, edge):
+        """Collect an added, removed, moved or restyled edge again on next
+        paint and repaint where it lies
+
+        :param edge: Edge that changed
+        :type edge: :class:`nodegraph.edge.Edge`
+
+        """
+        self._dirty_edges[edge.hash] = edge
+        if not self.scene().is_batch:
+            self.update(edge.sceneBoundingRect())
+
+    def _collect(self):
+        """Update grid entries of edges invalidated since last paint
+
+        """
+        scene = self.scene()
+        if self._is_stale:
+            self._is_stale = False
+            self._grid.clear()
+            self._edges = {}
+            edges = dict(scene.edges_by_hash)
+        else:
+            edges = self._dirty_edges
+        self._dirty_edges = {}
+
+        edges_by_hash = scene.edges_by_hash
+        for ahash, edge in edges.items():
+            if edges_by_hash.get(ahash) is not edge or not edge.is_layered:
+                self._grid.remove(ahash)
+                self._edges.pop(ahash, None)
+                continue
+
+            rect = edge.sceneBoundingRect()
+            self._grid.insert(ahash, [(rect.left(), rect.top(),
+                                       rect.right(), rect.bottom(), ahash)])
+            pos = edge.scenePos()
+            self._edges[ahash] = (edge, edge._line.translated(pos), pos)
+
+    def shape(self):
+        """Re-implement shape method
+        Empty so that the layer is never picked by scene items() queries
+
+        """
+        return QtGui.QPainterPath()
+
+    def boundingRect(self):
+        """Re-implement bounding box method
+        The layer spans the whole scene, drawing is culled by exposed rect
+
+        """
+        return self.scene().sceneRect()
+
+    def paint(self, painter, option, widget=None):
+        """Re-implement paint method
+
+        """
+        scene = self.scene()
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+        if lod < OVERVIEW_LOD and scene.overview_layer is not None:
+            return
+
+        self._collect()
+        draw_arrows = lod > OVERVIEW_LOD
+
+        # Gather lines and arrows of visible edges, grouped by pen
+        strokes = {}
+        rect = option.exposedRect
+        edges = self._edges
+        for ahash in self._grid.query_rect(rect.left(), rect.top(),
+                                           rect.right(), rect.bottom()):
+            edge, line, pos = edges[ahash]
+            width = edge._stroke_width(lod)
+            role = "invert" if edge.double_click else "text"
+            key = (role, width)
+            if key not in strokes:
+                strokes[key] = ([], QtGui.QPainterPath())
+            lines, arrows = strokes[key]
+
+            lines.append(line)
+            if draw_arrows and edge._arrow:
+                arrows.addPolygon(edge._arrow_polygon(width).translated(pos))
+
+        style = scene.style_cache
+        for (role, width), (lines, arrows) in strokes.items():
+            painter.setPen(style.pen(role, width))
+            painter.drawLines(lines)
+            if not arrows.isEmpty():
+                painter.fillPath(arrows, style.brush(role))
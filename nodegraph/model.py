@@ -0,0 +1,391 @@
+# =============================================================================
+# Nodegraph-pyqt
+#
+# Everyone is permitted to copy and distribute verbatim copies of this
+# document, but changing it is not allowed without permissions.
+#
+# For any questions, please contact: dsideb@gmail.com
+#
+# GNU LESSER GENERAL PUBLIC LICENSE (Version 3, 29 June 2007)
+# =============================================================================
+
+"""
+Headless graph model including:
+
+    * GraphModel
+
+This module must not depend on Qt so it can be used to load, query and
+mutate graphs without any display.
+
+"""
+import itertools
+
+
+class GraphModel(object):
+
+    """
+    Graph topology made of nodes, slots and edges, all identified by
+    integer ids.
+
+    Observers registered with :meth:`add_observer` are notified of any
+    change through the following optional methods:
+
+        * on_node_added(node_id)
+        * on_node_removed(node_id)
+        * on_node_renamed(node_id, old_name, name)
+        * on_edge_added(edge_id)
+        * on_edge_removed(edge_id)
+
+    """
+
+    INPUT = 0
+    OUTPUT = 1
+
+    def __init__(self):
+        """Create an instance of this class
+
+        """
+        self._node_ids = itertools.count()
+        self._slot_ids = itertools.count()
+        self._edge_ids = itertools.count()
+
+        # node id -> (name, input slot ids, output slot ids)
+        self._nodes = {}
+        # node name -> node id, names are unique
+        self._node_names = {}
+        # node id -> user data
+        self._node_data = {}
+        # slot id -> (node id, name, family)
+        self._slots = {}
+        # edge id -> (source slot id, target slot id)
+        self._edges = {}
+
+        # slot id -> edge ids (dict used as an ordered set)
+        self._incoming = {}
+        self._outgoing = {}
+
+        self._observers = []
+
+    def add_observer(self, observer):
+        """Register an object to be notified of any graph change
+
+        :param observer: Object implementing any of the on_* methods
+        :type observer: object
+
+        """
+        if observer not in self._observers:
+            self._observers.append(observer)
+
+    def remove_observer(self, observer):
+        """Unregister an observer
+
+        :param observer: Previously registered observer
+        :type observer: object
+
+        """
+        if observer in self._observers:
+            self._observers.remove(observer)
+
+    def _notify(self, name, *args):
+        """Call given method on every observer implementing it
+
+        """
+        for observer in list(self._observers):
+            callback = getattr(observer, name, None)
+            if callback is not None:
+                callback(*args)
+
+    # Nodes
+    # -------------------------------------------------------------------------
+
+    def add_node(self, name, inputs=("in",), outputs=("out",), data=None):
+        """Add a node with the given slots
+
+        :param name: Node name
+        :type name: str
+
+        :param inputs: Input slot names
+        :type inputs: list
+
+        :param outputs: Output slot names
+        :type outputs: list
+
+        :param data: Arbitrary data attached to the node
+        :type data: dict
+
+        :returns: Node id
+        :rtype: int
+
+        :raises ValueError: If a node of the same name already exists
+
+        """
+        if name in self._node_names:
+            raise ValueError("Node %r already exists" % name)
+
+        node_id = next(self._node_ids)
+        input_ids = tuple(self._add_slot(node_id, n, self.INPUT)
+                          for n in inputs)
+        output_ids = tuple(self._add_slot(node_id, n, self.OUTPUT)
+                           for n in outputs)
+        self._nodes[node_id] = (name, input_ids, output_ids)
+        self._node_names[name] = node_id
+        self._node_data[node_id] = dict(data or {})
+
+        self._notify("on_node_added", node_id)
+        return node_id
+
+    def _add_slot(self, node_id, name, family):
+        """Register a new slot and return its id
+
+        """
+        slot_id = next(self._slot_ids)
+        self._slots[slot_id] = (node_id, name, family)
+        return slot_id
+
+    def remove_node(self, node_id):
+        """Remove a node, its slots and every edge connected to it
+
+        :param node_id: Node id
+        :type node_id: int
+
+        :raises KeyError: If the node does not exist
+
+        """
+        if node_id not in self._nodes:
+            raise KeyError("Unknown node %r" % node_id)
+
+        for edge_id in self.node_edges(node_id):
+            self.remove_edge(edge_id)
+
+        self._notify("on_node_removed", node_id)
+
+        name, input_ids, output_ids = self._nodes.pop(node_id)
+        del self._node_names[name]
+        del self._node_data[node_id]
+        for slot_id in input_ids + output_ids:
+            del self._slots[slot_id]
+
+    def has_node(self, node_id):
+        """Return True if a node of the given id exists
+
+        :rtype: bool
+
+        """
+        return node_id in self._nodes
+
+    @property
+    def nodes(self):
+        """Return all node ids
+
+        :rtype: list
+
+        """
+        return list(self._nodes)
+
+    def node_name(self, node_id):
+        """Return name of a node
+
+        :rtype: str
+
+        """
+        return self._nodes[node_id][0]
+
+    def find_node(self, name):
+        """Return id of the node of the given name
+
+        :param name: Node name
+        :type name: str
+
+        :returns: Node id or None
+        :rtype: int
+
+        """
+        return self._node_names.get(name)
+
+    def set_node_name(self, node_id, name):
+        """Rename a node
+
+        :param node_id: Node id
+        :type node_id: int
+
+        :param name: New node name
+        :type name: str
+
+        :raises ValueError: If another node already uses this name
+
+        """
+        old_name, input_ids, output_ids = self._nodes[node_id]
+        if name == old_name:
+            return
+        if name in self._node_names:
+            raise ValueError("Node %r already exists" % name)
+
+        del self._node_names[old_name]
+        self._node_names[name] = node_id
+        self._nodes[node_id] = (name, input_ids, output_ids)
+
+        self._notify("on_node_renamed", node_id, old_name, name)
+
+    def node_data(self, node_id):
+        """Return user data attached to a node
+
+        :rtype: dict
+
+        """
+        return self._node_data[node_id]
+
+    def node_inputs(self, node_id):
+        """Return input slot ids of a node
+
+        :rtype: tuple
+
+        """
+        return self._nodes[node_id][1]
+
+    def node_outputs(self, node_id):
+        """Return output slot ids of a node
+
+        :rtype: tuple
+
+        """
+        return self._nodes[node_id][2]
+
+    def node_edges(self, node_id):
+        """Return ids of all edges connected to a node
+
+        :rtype: list
+
+        """
+        _, input_ids, output_ids = self._nodes[node_id]
+        edges = {}
+        for slot_id in input_ids + output_ids:
+            edges.update(self._incoming.get(slot_id, {}))
+            edges.update(self._outgoing.get(slot_id, {}))
+        return list(edges)
+
+    # Slots
+    # -------------------------------------------------------------------------
+
+    def slot_node(self, slot_id):
+        """Return id of the node owning a slot
+
+        :rtype: int
+
+        """
+        return self._slots[slot_id][0]
+
+    def slot_name(self, slot_id):
+        """Return name of a slot
+
+        :rtype: str
+
+        """
+        return self._slots[slot_id][1]
+
+    def slot_family(self, slot_id):
+        """Return family of a slot, INPUT or OUTPUT
+
+        :rtype: int
+
+        """
+        return self._slots[slot_id][2]
+
+    def incoming_edges(self, slot_id):
+        """Return ids of edges whose target is the given slot
+
+        :rtype: list
+
+        """
+        return list(self._incoming.get(slot_id, ()))
+
+    def outgoing_edges(self, slot_id):
+        """Return ids of edges whose source is the given slot
+
+        :rtype: list
+
+        """
+        return list(self._outgoing.get(slot_id, ()))
+
+    def is_slot_connected(self, slot_id):
+        """Return True if any edge starts or ends at a slot
+
+        :rtype: bool
+
+        """
+        return slot_id in self._incoming or slot_id in self._outgoing
+
+    # Edges
+    # -------------------------------------------------------------------------
+
+    def add_edge(self, source_slot, target_slot):
+        """Connect two slots
+
+        :param source_slot: Source slot id
+        :type source_slot: int
+
+        :param target_slot: Target slot id
+        :type target_slot: int
+
+        :returns: Edge id
+        :rtype: int
+
+        """
+        if source_slot not in self._slots:
+            raise KeyError("Unknown source slot %r" % source_slot)
+        if target_slot not in self._slots:
+            raise KeyError("Unknown target slot %r" % target_slot)
+
+        edge_id = next(self._edge_ids)
+        self._edges[edge_id] = (source_slot, target_slot)
+        self._outgoing.setdefault(source_slot, {})[edge_id] = None
+        self._incoming.setdefault(target_slot, {})[edge_id] = None
+
+        self._notify("on_edge_added", edge_id)
+        return edge_id
+
+    def remove_edge(self, edge_id):
+        """Disconnect an edge
+
+        :param edge_id: Edge id
+        :type edge_id: int
+
+        :raises KeyError: If the edge does not exist
+
+        """
+        if edge_id not in self._edges:
+            raise KeyError("Unknown edge %r" % edge_id)
+
+        self._notify("on_edge_removed", edge_id)
+
+        source_slot, target_slot = self._edges.pop(edge_id)
+        for index, slot_id in ((self._outgoing, source_slot),
+                               (self._incoming, target_slot)):
+            edges = index[slot_id]
+            del edges[edge_id]
+            if not edges:
+                del index[slot_id]
+
+    def has_edge(self, edge_id):
+        """Return True if an edge of the given id exists
+
+        :rtype: bool
+
+        """
+        return edge_id in self._edges
+
+    @property
+    def edges(self):
+        """Return all edge ids
+
+        :rtype: list
+
+        """
+        return list(self._edges)
+
+    def edge_slots(self, edge_id):
+        """Return source and target slot ids of an edge
+
+        :rtype: tuple
+
+        """
+        return self._edges[edge_id]
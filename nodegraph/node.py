@@ -17,8 +17,12 @@ Base node definition including:
 
 """
 # import sha
+import bisect
+import itertools
+import math
+
 from Qt import QtCore, QtGui, QtWidgets
-import PySide2
+from .constant import OVERVIEW_LOD
 
 # from constant import DEBUG
 
@@ -33,6 +37,13 @@ class Node(QtWidgets.QGraphicsItem):
 
     """
 
+    # Levels of detail at which nodes are rasterized when the scene node
+    # cache is enabled, matching the thresholds used by paint
+    CACHE_LODS = (0.15, 0.2, 0.25, 0.35, 0.5, 0.7, 1.0)
+
+    # Unlike id(), never reused by a later node
+    _cache_ids = itertools.count()
+
     def __init__(self, name, scene, inputs=["in"], outputs=["out"], parent=None, width=160, height=130, selectable=True, movable=True):
         """Create an instance of this class
 
@@ -40,15 +51,24 @@ class Node(QtWidgets.QGraphicsItem):
         QtWidgets.QGraphicsItem.__init__(self, parent=parent)
         scene.addItem(self)
         self._name = name
+        self._id = None
         self._width = width
         self._height = height
         self._outline = 6
         self._slot_radius = 10
         self._label_height = 34
         self._bbox = None  # cache container
+        self._edges = set()  # hashes of edges connected to any slot
         self._round_slot = None
         self._rect_slot = None
         self._hover_slot = False
+        self._hot_zones = []  # (tops, zones) per slot column
+        self._press_zones = []  # same, wider to start edges from labels
+        self._label_rect = None
+        self._title_text = None  # (position, static text)
+        self._slot_texts = []  # (position, static text) per slot
+        self._cache_id = next(Node._cache_ids)
+        self._cache_version = 0  # bumped to invalidate cached pixmaps
         self.update_title = None
 
         self.label_rect_size = None
@@ -63,6 +83,9 @@ class Node(QtWidgets.QGraphicsItem):
         # self.setFlags(QtWidgets.QGraphicsItem.ItemIsMovable |
         #               QtWidgets.QGraphicsItem.ItemIsSelectable)
 
+        # Report moves so that connected edges follow, however they happen
+        self.setFlag(QtWidgets.QGraphicsItem.ItemSendsGeometryChanges)
+
         self.setAcceptHoverEvents(False)
 
         # Build output slot
@@ -95,6 +118,13 @@ class Node(QtWidgets.QGraphicsItem):
         """
         return self._name
 
+    @property
+    def id(self):
+        """Return the id of the node in the scene graph model
+
+        """
+        return self._id
+
     @property
     def active_inputs(self):
         return [inp for inp in self._inputs if inp.active == True]
@@ -115,12 +145,55 @@ class Node(QtWidgets.QGraphicsItem):
     def edges(self):
         """Return all hashes of connected edges
 
+        The returned set is maintained by the node slots and must not be
+        modified.
+
+        """
+        return self._edges
+
+    def _release_edges(self, hashes):
+        """Forget edge hashes no slot of this node holds anymore, an edge
+        looping back to this node being held by two slots
+
+        :param hashes: Hashes just removed from a slot
+        :type hashes: set
+
+        """
+        slots = self._inputs + self._outputs
+        self._edges -= set(ahash for ahash in hashes
+                           if not any(ahash in slot._edge for slot in slots))
+
+    @property
+    def slot_hot_zones(self):
+        """Return (rectangle, slot) tuples of the area reacting to each
+        slot in node coordinates. Zones extend from the slot toward the
+        middle of the node to include slot labels.
+
+        :rtype: list
+
         """
-        # outputs = self._output.edge
-        outputs = list(set([e for i in self._outputs for e in i.edge]))
-        inputs = list(set([e for i in self._inputs for e in i.edge]))
-        res = set(outputs+inputs)
-        return res
+        return [zone for _, zones in self._hot_zones for zone in zones]
+
+    def slot_at(self, pos, press=False):
+        """Return slot whose hot zone contains the given point
+
+        :param pos: Position in node coordinates
+        :type pos: :class:`QtCore.QPointF`
+
+        :param press: If true, use press zones which span the whole label
+            width instead of half of it
+        :type press: bool
+
+        :returns: A slot or None
+        :rtype: :class:`nodegraph.node.NodeSlot`
+
+        """
+        y = pos.y()
+        for tops, zones in (self._press_zones if press else self._hot_zones):
+            index = bisect.bisect_right(tops, y) - 1
+            if index >= 0 and zones[index][0].contains(pos):
+                return zones[index][1]
+        return None
 
     def change_node_colors(self, names_to_colors, input):
         if input:
@@ -235,15 +308,135 @@ class Node(QtWidgets.QGraphicsItem):
             self._width + self._outline + self._slot_radius * 2,
             self._height + self._outline)
 
+        # Update label background
+        self._label_rect = QtCore.QRectF(self._outline / 2,
+                                         self._outline / 2,
+                                         self._width - self._outline,
+                                         self._label_height - self._outline / 2)
+        self.label_rect_size = (self._label_rect.width(),
+                                self._label_rect.height())
+
+        self._update_hot_zones()
+        self._update_texts()
+
+    def _static_text(self, text, font, rect, alignment):
+        """Lay out a single line of text once so that it can be drawn
+        without being shaped again
+
+        :param text: Text to lay out
+        :type text: str
+
+        :param font: Font the text will be drawn with
+        :type font: :class:`QtGui.QFont`
+
+        :param rect: Rectangle to align the text in
+        :type rect: :class:`QtCore.QRectF`
+
+        :param alignment: Horizontal alignment (left, right or center)
+        :type alignment: :class:`QtCore.Qt.AlignmentFlag`
+
+        :returns: Top left position and static text
+        :rtype: tuple
+
+        """
+        static_text = QtGui.QStaticText(text)
+        static_text.setTextFormat(QtCore.Qt.PlainText)
+        static_text.prepare(QtGui.QTransform(), font)
+        size = static_text.size()
+
+        x = rect.left()
+        if alignment & QtCore.Qt.AlignRight:
+            x = rect.right() - size.width()
+        elif alignment & QtCore.Qt.AlignHCenter:
+            x = rect.center().x() - size.width() / 2
+        y = rect.center().y() - size.height() / 2
+
+        return QtCore.QPointF(x, y), static_text
+
+    def _update_texts(self):
+        """Update static texts of title and slot labels
+
+        """
+        style = self.scene().style_cache
+        self._title_text = self._static_text(self.update_title or self._name,
+                                             style.title_font,
+                                             self._label_rect,
+                                             QtCore.Qt.AlignHCenter)
+
+        width = self._width / 2 - self._slot_radius - self._outline
+        height = self._slot_radius * 2
+
+        self._slot_texts = []
+        for anoutput in self._outputs:
+            if not anoutput.name:
+                continue
+            rect = QtCore.QRectF(self._width / 2 + self._outline,
+                                 anoutput._rect.top(),
+                                 width,
+                                 height)
+            self._slot_texts.append(self._static_text(
+                anoutput.name, style.slot_font, rect, QtCore.Qt.AlignRight))
+        for aninput in self._inputs:
+            if not aninput.name:
+                continue
+            rect = QtCore.QRectF(self._slot_radius + self._outline,
+                                 aninput._rect.top(),
+                                 width,
+                                 height)
+            self._slot_texts.append(self._static_text(
+                aninput.name, style.slot_font, rect, QtCore.Qt.AlignLeft))
+
+    def _update_hot_zones(self):
+        """Update slot hot zones, sorted by top so that they can be looked
+        up with a binary search
+
+        """
+        self._hot_zones = self._build_hot_zones(self.label_rect_size[0] / 2)
+        self._press_zones = self._build_hot_zones(self.label_rect_size[0])
+
+    def _build_hot_zones(self, margin):
+        """Return (tops, zones) per slot column, zones extending slots by a
+        margin toward the middle of the node
+
+        :param margin: Extension of slot rectangles
+        :type margin: float
+
+        :rtype: list
+
+        """
+        hot_zones = []
+        for slots, adjust in ((self._outputs, (-margin, 0, 0, 0)),
+                              (self._inputs, (0, 0, margin, 0))):
+            # Skip spacers
+            zones = sorted(((slot.rect.adjusted(*adjust), slot)
+                            for slot in slots if not slot.rect.isEmpty()),
+                           key=lambda zone: zone[0].top())
+            hot_zones.append(([zone[0].top() for zone in zones], zones))
+        return hot_zones
+
     def _update_hover_slot(self, slot):
         if slot == self._hover_slot:
             # No change
             return
 
+        # Cached pixmaps are keyed by hover slot, no need to invalidate them
         self._hover_slot = slot
 
         self.update()
 
+    def update_name(self, name):
+        """Rename node, use :meth:`nodegraph.scene.Scene.update_node_name`
+        to keep the scene name index in sync
+
+        :param name: New node name
+        :type name: str
+
+        """
+        self._name = name
+        self._update_texts()
+        self._cache_version += 1
+        self.update()
+
     def _update_title(self, name):
         self.update_title = name
         self.refresh()
@@ -260,42 +453,113 @@ class Node(QtWidgets.QGraphicsItem):
 
         """
         lod = option.levelOfDetailFromTransform(painter.worldTransform())
+        selected = bool(option.state & QtWidgets.QStyle.State_Selected)
+
+        # Slots are only hoverable when drawn, even from a cached pixmap
+        hoverable = lod >= 0.15
+        if self.acceptHoverEvents() != hoverable:
+            self.setAcceptHoverEvents(hoverable)
+
+        # Drawn by the overview layer in views zoomed out that much
+        if lod < OVERVIEW_LOD and self.scene().overview_layer is not None:
+            return
+
+        if self.scene().node_cache and lod >= self.CACHE_LODS[0]:
+            self._paint_cached(painter, lod, selected)
+        else:
+            self._paint(painter, lod, selected)
+
+    def _paint_cached(self, painter, lod, selected):
+        """Draw node from a pixmap rasterized once per level of detail
+        bucket, selection and hovered slot
+
+        :param painter: Active painter
+        :type painter: :class:`QtGui.QPainter`
+
+        :param lod: Current level of detail
+        :type lod: float
+
+        :param selected: Selection state
+        :type selected: bool
+
+        """
+        index = bisect.bisect_right(self.CACHE_LODS, lod) - 1
+        bucket_lod = self.CACHE_LODS[index]
+        # Rasterize at the top of the bucket, only scaling pixmaps down
+        scale = self.CACHE_LODS[min(index + 1, len(self.CACHE_LODS) - 1)]
+
+        # Rasterize at device resolution on high DPI screens
+        ratio = painter.device().devicePixelRatioF()
+
+        key = "nodegraph_node:%d:%d:%d:%d:%d:%d:%d" % (
+            self._cache_id, self._cache_version,
+            self.scene().style_cache.generation, index, selected,
+            self._hover_slot.id if self._hover_slot else -1,
+            int(round(ratio * 100)))
+
+        pixmap = QtGui.QPixmapCache.find(key)
+        if pixmap is None or pixmap.isNull():
+            rect = self._bbox
+            pixmap = QtGui.QPixmap(
+                int(math.ceil(rect.width() * scale * ratio)),
+                int(math.ceil(rect.height() * scale * ratio)))
+            pixmap.setDevicePixelRatio(ratio)
+            pixmap.fill(QtCore.Qt.transparent)
+
+            cache_painter = QtGui.QPainter(pixmap)
+            cache_painter.setRenderHints(painter.renderHints())
+            cache_painter.scale(scale, scale)
+            cache_painter.translate(-rect.topLeft())
+            self._paint(cache_painter, bucket_lod, selected)
+            cache_painter.end()
+
+            QtGui.QPixmapCache.insert(key, pixmap)
+
+        painter.save()
+        painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
+        painter.drawPixmap(self._bbox, pixmap, QtCore.QRectF(pixmap.rect()))
+        painter.restore()
+
+    def _paint(self, painter, lod, selected):
+        """Draw node for the given level of detail
+
+        :param painter: Active painter
+        :type painter: :class:`QtGui.QPainter`
+
+        :param lod: Level of detail
+        :type lod: float
+
+        :param selected: Selection state
+        :type selected: bool
+
+        """
+        style = self.scene().style_cache
 
         # Resolve fill, text and outlines brush
-        fill_brush = self.scene().palette().button()
-        text_brush = self.scene().palette().text()
-        if option.state & QtWidgets.QStyle.State_Selected:
-            fill_brush = self.scene().palette().highlight()
-            text_brush = self.scene().palette().highlightedText()
+        fill_role = "button"
+        text_role = "text"
+        if selected:
+            fill_role = "highlight"
+            text_role = "highlighted_text"
+        outline_pen = style.pen(fill_role, self._outline)
 
         # Set brush and pen, then start drawing
-        painter.setBrush(self.scene().palette().buttonText())
-        painter.setPen(QtGui.QPen(fill_brush, self._outline))
+        painter.setBrush(style.brush("button_text"))
+        painter.setPen(outline_pen)
 
         # Draw primary shape
         painter.drawRect(0, 0, self._width, self._height + self._outline + self._slot_radius * 2)
 
         # Draw label background
         # TODO: Color should be based on node type
-        painter.setBrush(QtGui.QColor(90, 90, 140))
+        painter.setBrush(style.brush("label"))
         painter.setPen(QtCore.Qt.NoPen)
-        label_rect = QtCore.QRectF(self._outline / 2,
-                                   self._outline / 2,
-                                   self._width - self._outline,
-                                   self._label_height - self._outline / 2)
-        self.label_rect_size = (label_rect.width(), label_rect.height())
-        painter.drawRect(label_rect)
+        painter.drawRect(self._label_rect)
         # Draw text
         if lod >= 0.2:
-            font = QtGui.QFont("Arial", 14)
-            font.setStyleStrategy(QtGui.QFont.ForceOutline)
-            painter.setFont(font)
-            painter.setPen(QtGui.QPen(text_brush, 1))
-            painter.scale(1, 1)
-            if not self.update_title:
-                painter.drawText(label_rect, QtCore.Qt.AlignCenter, self._name)
-            else:
-                painter.drawText(label_rect, QtCore.Qt.AlignCenter, self.update_title)
+            painter.setFont(style.title_font)
+            painter.setPen(style.pen(text_role))
+            painter.drawStaticText(*self._title_text)
 
 
         # Draw slots
@@ -303,11 +567,10 @@ class Node(QtWidgets.QGraphicsItem):
             # Should be driven by slot type
 
             # move this into the __init__ of the NodeSlot
-            hover_color = QtGui.QColor(90, 90, 140)
-            hover_normal = self.scene().palette().text()
-            self.setAcceptHoverEvents(True)
+            hover_color = style.brush("label")
+            hover_normal = style.brush("text")
             painter.setBrush(hover_normal)
-            painter.setPen(QtGui.QPen(fill_brush, self._outline))
+            painter.setPen(outline_pen)
 
             if lod >= 0.35:
                 for anoutput in self._outputs:
@@ -342,37 +605,14 @@ class Node(QtWidgets.QGraphicsItem):
                     else:
                         painter.setBrush(hover_normal)
                     painter.drawRect(aninput.rect)
-        else:
-            self.setAcceptHoverEvents(False)
 
         # Draw slot labels
         if lod >= 0.25:
-            font = QtGui.QFont("Arial", 11)
-            font.setStyleStrategy(QtGui.QFont.ForceOutline)
-            painter.setFont(font)
-            painter.setPen(QtGui.QPen(self.scene().palette().text(), 1))
-
-            width = self._width / 2 - self._slot_radius - self._outline
-            height = self._slot_radius * 2
+            painter.setFont(style.slot_font)
+            painter.setPen(style.pen("text"))
 
-            # Output
-            alignment = QtCore.Qt.AlignVCenter | QtCore.Qt.AlignRight
-
-            for anoutput in self._outputs:
-                rect = QtCore.QRectF(self._width / 2 + self._outline,
-                                     anoutput._rect.top(),
-                                     width,
-                                     height)
-                painter.drawText(rect, alignment, anoutput.name)
-
-            # Input
-            alignment = QtCore.Qt.AlignVCenter | QtCore.Qt.AlignLeft
-            for aninput in self._inputs:
-                rect = QtCore.QRectF(self._slot_radius + self._outline,
-                                     aninput._rect.top(),
-                                     width,
-                                     height)
-                painter.drawText(rect, alignment, aninput.name)
+            for position, static_text in self._slot_texts:
+                painter.drawStaticText(position, static_text)
 
 
         return
@@ -385,18 +625,7 @@ class Node(QtWidgets.QGraphicsItem):
 
         """
 
-        left_margin = PySide2.QtCore.QMarginsF(self.label_rect_size[0]/2, 0, 0, 0)
-
-        right_margin = PySide2.QtCore.QMarginsF(0, 0, self.label_rect_size[0]/2, 0)
-
-        his = [i for i in self._inputs if (i._rect + right_margin).contains(event.pos())]
-        hos =  [i for i in self._outputs if (i._rect + left_margin).contains(event.pos())]
-        if hos:
-            self._update_hover_slot(hos[0])
-        elif his:
-            self._update_hover_slot(his[0])
-        else:
-            self._update_hover_slot(False)
+        self._update_hover_slot(self.slot_at(event.pos()) or False)
 
         # Call normal behavior
         QtWidgets.QGraphicsItem.hoverMoveEvent(self, event)
@@ -424,60 +653,36 @@ class Node(QtWidgets.QGraphicsItem):
         """
 
         buttons = event.buttons()
-        clicked_zone = event.pos()
         if regular:
 
             if buttons == QtCore.Qt.LeftButton:
                 self.scene().toggle_connection_clicked()
 
-                for anoutput in self._outputs:
-                    left_margin = PySide2.QtCore.QMarginsF(self.label_rect_size[0], 0, 0, 0)
-                    start_zone = anoutput._rect + left_margin
-                    if start_zone.contains(event.pos()):
-                        mouse_pos = self.mapToScene(event.pos())
-                        self._update_hover_slot(anoutput)
-                        if self.scene().draw_line:
-                            self.scene().start_interactive_edge(anoutput, mouse_pos)
-                            self.scene().store_source_node(anoutput)
-
-                            self.clicks+=1
-                        event.accept()
-                        return
-                for aninput in self._inputs:
-                    right_margin = PySide2.QtCore.QMarginsF(0, 0, self.label_rect_size[0], 0)
-                    end_zone = aninput._rect + right_margin
-                    if end_zone.contains(event.pos()):
-                        mouse_pos = self.mapToScene(event.pos())
-                        self._update_hover_slot(aninput)
-
-                        if self.scene().draw_line:
-                            self.scene().start_interactive_edge(aninput, mouse_pos)
-                            # event.accept()
-                            self.clicks+=1
-                        event.accept()
-
-                        return
-        else:
-            for anoutput in self._outputs:
-
-                left_margin = PySide2.QtCore.QMarginsF(self.label_rect_size[0], 0, 0, 0)
-                start_zone = anoutput._rect + left_margin
-                if start_zone.contains(event.scenePos()):
-                    mouse_pos = self.mapToScene(event.scenePos())
-                    self._update_hover_slot(anoutput)
-                    self.scene().start_interactive_edge(anoutput, mouse_pos)
+                slot = self.slot_at(event.pos(), press=True)
+                if slot is not None:
+                    mouse_pos = self.mapToScene(event.pos())
+                    self._update_hover_slot(slot)
+                    if self.scene().draw_line:
+                        self.scene().start_interactive_edge(slot, mouse_pos)
+                        if slot.family & NodeSlot.OUTPUT:
+                            self.scene().store_source_node(slot)
 
-                    self.scene().store_source_node(anoutput)
-                    event.accept()
-                    return
-            for aninput in self._inputs:
-                right_margin = PySide2.QtCore.QMarginsF(0, 0, self.label_rect_size[0], 0)
-                end_zone = aninput._rect + right_margin
-                if end_zone.contains(event.scenePos()):
-                    mouse_pos = self.mapToScene(event.scenePos())
-                    self.scene().start_interactive_edge(aninput, mouse_pos)
+                        self.clicks+=1
                     event.accept()
                     return
+        else:
+            # Event comes from the scene, resolve slot from scene position
+            mouse_pos = event.scenePos()
+            slot = self.slot_at(self.mapFromScene(mouse_pos), press=True)
+            if slot is not None:
+                if slot.family & NodeSlot.OUTPUT:
+                    self._update_hover_slot(slot)
+                    self.scene().start_interactive_edge(slot, mouse_pos)
+                    self.scene().store_source_node(slot)
+                else:
+                    self.scene().start_interactive_edge(slot, mouse_pos)
+                event.accept()
+                return
 
         QtWidgets.QGraphicsItem.mousePressEvent(self, event)
 
@@ -521,6 +726,26 @@ class Node(QtWidgets.QGraphicsItem):
         QtWidgets.QGraphicsItem.mouseMoveEvent(self, event)
 
 
+    def itemChange(self, change, value):
+        """Re-implement item change to let the scene update connected edges
+        and track selection
+
+        """
+        if change == QtWidgets.QGraphicsItem.ItemPositionHasChanged:
+            scene = self.scene()
+            if scene is not None:
+                scene._on_node_moved(self)
+        elif change == QtWidgets.QGraphicsItem.ItemSelectedHasChanged:
+            scene = self.scene()
+            if scene is not None:
+                scene._on_item_selected(self, self.isSelected())
+        elif change == QtWidgets.QGraphicsItem.ItemVisibleHasChanged:
+            scene = self.scene()
+            if scene is not None:
+                scene._update_node_geometry(self)
+
+        return QtWidgets.QGraphicsItem.itemChange(self, change, value)
+
     def refresh(self, refresh_edges=True):
         """Refreh node
 
@@ -530,6 +755,9 @@ class Node(QtWidgets.QGraphicsItem):
         """
         self.prepareGeometryChange()
         self._update()
+        self._cache_version += 1
+        if self.scene() is not None:
+            self.scene()._update_node_geometry(self)
         if refresh_edges and self.edges:
             for ahash in self.edges:
                 try:
@@ -554,6 +782,7 @@ class NodeSlot(object):
 
         """
         self._name = name
+        self._id = None
         self.parent = parent
         self._family = family or self.INPUT
         self._rect = None
@@ -580,6 +809,13 @@ class NodeSlot(object):
         """
         return self._family
 
+    @property
+    def id(self):
+        """Return the id of the slot in the scene graph model
+
+        """
+        return self._id
+
     @property
     def rect(self):
         """Return bounding box of slot
@@ -617,26 +853,33 @@ class NodeSlot(object):
     def edge(self, value):
         """Set property edge (replace)
 
-        :type value: str or list
+        :type value: int or list
 
         """
+        previous = self._edge
         self._edge = set(value if isinstance(value, list) else [value])
+        self.parent._edges |= self._edge
+        self.parent._release_edges(previous - self._edge)
 
     def add_edge(self, value):
         """Add edge hash(es) to set
 
-        :type value: str or list
+        :type value: int or list
 
         """
-        self._edge |= set(value if isinstance(value, list) else [value])
+        value = set(value if isinstance(value, list) else [value])
+        self._edge |= value
+        self.parent._edges |= value
 
     def remove_edge(self, value):
         """Remove edge hash(es) from set
 
-        :type value: str or list
+        :type value: int or list
 
         """
-        self._edge -= set(value if isinstance(value, list) else [value])
+        value = set(value if isinstance(value, list) else [value])
+        self._edge -= value
+        self.parent._release_edges(value)
     @property
     def hover_color(self):
         return self._hover_color
@@ -644,4 +887,7 @@ class NodeSlot(object):
     @hover_color.setter
     def hover_color(self, color):
         self._hover_color = color
+        # Cached pixmaps of the node show the previous color
+        self.parent._cache_version += 1
+        self.parent.update()
 
@@ -15,17 +15,20 @@ default one with a large numbers of items
 
 """
 
-from Qt import QtCore, QtGui, QtWidgets
+from Qt import QtCore, QtGui
 # from .node import Node
 from .edge import Edge
 
 # from constant import DEBUG
 
 
-class RubberBand(QtWidgets.QGraphicsItem):
+class RubberBand(object):
 
     """
-    Draw outline of a rectangle (as a shape)
+    Draw outline of a rectangle
+
+    It is not a scene item but an overlay drawn by views in their
+    foreground, so that following the mouse never touches the scene index.
 
     """
 
@@ -50,67 +53,45 @@ class RubberBand(QtWidgets.QGraphicsItem):
         :rtype: :class:`nodegraph.rubberband.RubberBand`
 
         """
-        QtWidgets.QGraphicsItem.__init__(self, parent=None)
-        scene.addItem(self)
+        self._scene = scene
         self._source_pos = init_pos
         self._mouse_pos = init_pos
         self._outline = outline
-        self._shape = None
+        self._rect = None
         self._selection_mode = self.REPLACE_SELECTION
         self.specific_color=color
 
-        # Settings
-        self.setZValue(10)
-
         # Update
         self._update()
+        scene.add_overlay(self)
 
     def _update(self):
         """Update internal properties
 
         """
-        # Update path
-        self._shape = QtGui.QPainterPath()
-        poly = QtGui.QPolygonF([
-            self._source_pos,
-            QtCore.QPointF(self._mouse_pos.x(), self._source_pos.y()),
-            self._mouse_pos,
-            QtCore.QPoint(self._source_pos.x(), self._mouse_pos.y())
-        ])
-        self._shape.addPolygon(poly)
-        self._shape.closeSubpath()
-
-    def update(self):
-        """Re-implement update of QtGraphicsItem
+        self._rect = QtCore.QRectF(self._source_pos,
+                                   self._mouse_pos).normalized()
 
-        """
-        # Update internal containers
-        self._update()
+    def rect(self):
+        """Return scene rectangle covered by the overlay
 
-        QtWidgets.QGraphicsLineItem.update(self)
-
-    def shape(self):
-        """Re-implement shape method
-        Return a QPainterPath that represents the bounding shape
+        :rtype: :class:`QtCore.QRectF`
 
         """
-        return self._shape
+        return self._rect
 
-    def boundingRect(self):
-        """Re-implement bounding box method
+    def paint(self, painter, lod):
+        """Draw overlay in scene coordinates
 
-        """
-        # Infer bounding box from shape
-        return self._shape.controlPointRect()
+        :param painter: Painter of a view foreground
+        :type painter: :class:`QtGui.QPainter`
 
-    def paint(self, painter, option, widget=None):
-        """Re-implement paint method
+        :param lod: Level of detail of the view
+        :type lod: float
 
         """
         # Define pen
-
-        palette = (self.scene().palette() if self.scene()
-                   else option.palette)
+        palette = self._scene.palette()
         pen = QtGui.QPen()
         if not self.specific_color:
             pen.setBrush(palette.highlight())
@@ -123,16 +104,13 @@ class RubberBand(QtWidgets.QGraphicsItem):
 
         # Draw Shape
         painter.setPen(pen)
-        # painter.drawPath(self._shape)
         if not self.specific_color:
             color = palette.highlight().color()
         else:
-            color = self.specific_color
+            color = QtGui.QColor(self.specific_color)
         color.setAlphaF(0.2)
-        painter.setBrush(QtGui.QColor(color))
-        painter.drawRect(self.shape().controlPointRect())
-
-        return
+        painter.setBrush(color)
+        painter.drawRect(self._rect)
 
     def refresh(self, mouse_pos=None, init_pos=None):
         """Update corner of rubber band defined by mouse pos
@@ -146,10 +124,9 @@ class RubberBand(QtWidgets.QGraphicsItem):
         if init_pos:
             self._source_pos = init_pos
 
-        # self.scene().setSelectionArea(self.shape(),
-        #                               QtCore.Qt.ContainsItemBoundingRect)
-        self.prepareGeometryChange()
-        self.update()
+        old_rect = self._rect
+        self._update()
+        self._scene.update_overlay(old_rect, self._rect)
 
     def update_scene_selection(self, operation=None, intersect=None):
         """Update scene selection from the current rubber band bounding box
@@ -158,76 +135,36 @@ class RubberBand(QtWidgets.QGraphicsItem):
         :type operation: int
 
         :param intersect:
-            Specify how items are selected, by default the item bounding box
-            must be fully contained
+            Specify how items are selected, by default any node or edge
+            whose shape intersects the rubber band is selected
         :type intersect: :class:`QtCore.Qt.ItemSelectionMode`
 
         """
         operation = operation or self.REPLACE_SELECTION
-        intersect = intersect or QtCore.Qt.ContainsItemBoundingRect
-        current_selection = self.scene().selectedItems()
-
-        if operation == self.ADD_SELECTION:
-            rect = self._shape
-            rect_scene = self.mapToScene(rect).boundingRect()
-            selected = self.scene().items(rect_scene)
-
-            for item in selected:
-                print(type(item))
-                item.setSelected(True)
-                if self.specific_color:
-                    try:
-                        item.invert_selected(True)
-                        item.refresh()
-                    except AttributeError:
-                        pass
-
-        elif operation == self.MINUS_SELECTION:
-            rect = self._shape
-            rect_scene = self.mapToScene(rect).boundingRect()
-            selected = self.scene().items(rect_scene)
-
-            for item in selected:
-                item.setSelected(False)
-                if self.specific_color:
-                    try:
-                        item.invert_selected(False)
-                        item.refresh()
-                    except AttributeError:
-                        pass
-
-        elif operation == self.TOGGLE_SELECTION:
-
-            items = self.scene().items()
-
-            for item in items:
-                item.setSelected(False)
-
-            rect = self._shape
-            rect_scene = self.mapToScene(rect).boundingRect()
-            selected = self.scene().items(rect_scene)
-            edges_to_delete = []
-            for item in selected:
-                if type(item) is Edge:
-                    edges_to_delete.append(item)
-            print(edges_to_delete)
-            self.scene().delete_edges(edges_to_delete)
-
-        else:
-            items = self.scene().items()
-
-            for item in items:
-                item.setSelected(False)
-
-            rect = self._shape
-            rect_scene = self.mapToScene(rect).boundingRect()
-            selected = self.scene().items(rect_scene)
-            for item in selected:
-                item.setSelected(True)
-
-                if self.specific_color:
+        intersect = intersect or QtCore.Qt.IntersectsItemShape
+        scene = self._scene
+        items = scene.query_rect(self._rect, intersect)
+
+        # Notify selection change once
+        with scene.selection_batch():
+            if operation == self.TOGGLE_SELECTION:
+                scene.clearSelection()
+                scene.delete_edges([item for item in items
+                                    if type(item) is Edge])
+                return
+
+            if operation == self.MINUS_SELECTION:
+                scene.select_items(items, False)
+            else:
+                if operation != self.ADD_SELECTION:
+                    scene.clearSelection()
+                scene.select_items(items)
+
+            if self.specific_color:
+                toggle = operation != self.MINUS_SELECTION
+                for item in items:
                     try:
-                        item.invert_selected(True)
+                        item.invert_selected(toggle)
                         item.refresh()
                     except AttributeError:
                         pass
@@ -12,13 +12,22 @@
 """Node graph scene manager based on QGraphicsScene
 
 """
+import contextlib
+import math
+
 from Qt import QtCore, QtGui, QtWidgets
-import PySide2
 from .node import Node, NodeSlot
 from .edge import Edge, InteractiveEdge
 from .rubberband import RubberBand
+from .model import GraphModel
+from .spatial import SlotGrid, ExtentTracker
+from .geometry import NodeGeometryStore, HAS_NUMPY
+from .style import StyleCache
+from .scheduler import FrameScheduler
+from .layer import OverviewLayer, EdgeLayer
 
-from .constant import SCENE_WIDTH, SCENE_HEIGHT
+from .constant import (SCENE_WIDTH, SCENE_HEIGHT, GROUP_MOVE_THRESHOLD,
+                       BSP_ITEMS_PER_LEAF, BSP_MIN_DEPTH, BSP_MAX_DEPTH)
 
 
 class Scene(QtWidgets.QGraphicsScene):
@@ -34,12 +43,44 @@ class Scene(QtWidgets.QGraphicsScene):
                  multiple_input_allowed=False,
                  convert=None, output_template=None,
                  attributes=None,
-                 drag_to_connect=False):
+                 drag_to_connect=False,
+                 model=None,
+                 node_cache=False,
+                 edge_layer=False,
+                 adaptive_index=True):
         """Create an instance of this class
 
+        :param model:
+            Graph to observe and render, a new empty one is created by
+            default
+        :type model: :class:`nodegraph.model.GraphModel`
+
+        :param node_cache:
+            If true, nodes are drawn from pixmaps rasterized once per level
+            of detail, selection and hovered slot
+        :type node_cache: bool
+
+        :param edge_layer:
+            If true, edges that are neither selected nor hovered are drawn
+            all at once by an edge layer
+        :type edge_layer: bool
+
+        :param adaptive_index:
+            If true, items are not indexed while dragging many nodes and the
+            BSP tree depth follows the number and spread of nodes
+        :type adaptive_index: bool
+
         """
         QtWidgets.QGraphicsScene.__init__(self, parent)
         self.drag_to_connect = drag_to_connect
+        self.node_cache = node_cache
+        self.adaptive_index = adaptive_index
+        if node_cache:
+            # Leave room for a few thousand cached nodes (in KB), the limit
+            # is process wide so it is only ever raised
+            cache_limit = 256 * 1024
+            if QtGui.QPixmapCache.cacheLimit() < cache_limit:
+                QtGui.QPixmapCache.setCacheLimit(cache_limit)
         self.parent = parent
         self.convert = convert
         self.output_template = output_template
@@ -51,16 +92,51 @@ class Scene(QtWidgets.QGraphicsScene):
         self.draw_line = False
 
         self._nodegraph_widget = nodegraph_widget
-        self._nodes = []
+        self._nodes = {}  # node name -> node, in creation order
+        self._nodes_by_id = {}
+        self._slots_by_id = {}
         self._edges_by_hash = {}
         self._is_interactive_edge = False
-        self._is_refresh_edges = False
         self._interactive_edge = None
-        self._refresh_edges = {"move": [], "refresh": []}
+        self._slot_grid = SlotGrid()
+        self._node_extent = ExtentTracker()  # of visible nodes
+        self._geometry = NodeGeometryStore() if HAS_NUMPY else None
+        self._hover_node = None
+        self._moved_nodes = {}  # used as an ordered set
+        self._moved_edges = {}
+        self._mouse_pos = QtCore.QPointF()
+        self._drag_pos = None  # last mouse position of a node drag
+        self._is_translating_nodes = False
+        self._drag_applied_pos = None  # position nodes were moved to
+        self._move_group = None
+        self._move_group_origin = None
+        self._is_move_group_indexed = True
+        self._move_group_edges = []  # edges crossing the group boundary
+        self._frame_scheduler = FrameScheduler(self)
         self._rubber_band = None
+        self._overlays = []
+        self._batch_depth = 0
+        self._batch_edges = {}
+        self._index_depth = 0
+        self._index_method = None
+        self._index_bsp_depth = 0
+        self._bsp_node_count = 0
+        self._selection_depth = 0
+        self._selected_nodes = set()
+        self._selected_edges = set()
+        self._selection_blocked = False
+        self._overview = None
+        self._is_overview = False
+        self._edge_layer = None
         self.multiple_input_allowed = multiple_input_allowed
 
-        self.connections_dict = {}
+        # Connections of every edge in the scene, source channel -> target
+        # channels, updated as edges are added or removed. It used to be
+        # rebuilt for the target node of the last created edge only, see
+        # get_connections for that per node view. Shared with the output
+        # template when given, which already accumulated all connections.
+        self.connections_dict = (output_template.connection_dict
+                                 if output_template is not None else {})
 
         self.source_node = None
         self.target_node = None
@@ -85,18 +161,211 @@ class Scene(QtWidgets.QGraphicsScene):
                          QtGui.QColor(80, 180, 255))
         palette.setColor(QtGui.QPalette.Button, QtGui.QColor(5, 5, 5))
         palette.setColor(QtGui.QPalette.ButtonText, QtGui.QColor(20, 20, 20))
+        self._style_cache = StyleCache(self)
         self.setPalette(palette)
 
         self.selectionChanged.connect(self._onSelectionChanged)
 
         self.only_allowed_connections = []
 
+        if edge_layer:
+            self.set_edge_layer(True)
+
+        # Observe graph model, rendering anything it already holds
+        self._model = model if model is not None else GraphModel()
+        self._model.add_observer(self)
+        if self._model.nodes:
+            with self.batch():
+                for node_id in self._model.nodes:
+                    self.on_node_added(node_id)
+                for edge_id in self._model.edges:
+                    self.on_edge_added(edge_id)
+
+    @property
+    def model(self):
+        """Return the graph model rendered by this scene
+
+        """
+        return self._model
+
     @property
     def nodes(self):
         """Return all nodes
 
         """
-        return self._nodes
+        return list(self._nodes.values())
+
+    def node(self, name):
+        """Return node of the given name
+
+        :param name: Node name
+        :type name: str
+
+        :returns: Matching node or None
+        :rtype: :class:`nodegraph.node.Node`
+
+        """
+        return self._nodes.get(name)
+
+    @property
+    def overview_layer(self):
+        """Return the layer drawing nodes and edges in views zoomed out below
+        the overview level of detail, if any view is
+
+        :rtype: :class:`nodegraph.layer.OverviewLayer`
+
+        """
+        return self._overview
+
+    @property
+    def is_overview(self):
+        """Return True if every view draws the scene through the overview
+        layer, nodes and edges then not being painted on their own at all
+
+        """
+        return self._is_overview
+
+    def update_overview(self):
+        """Follow the zoom level of views, each view deciding on its own
+        whether it draws the overview layer or detailed items
+
+        """
+        levels = [view.is_overview for view in self.views()]
+
+        if any(levels) and self._overview is None:
+            self._overview = OverviewLayer(self)
+        elif not any(levels) and self._overview is not None:
+            self.removeItem(self._overview)
+            self._overview = None
+
+        enabled = bool(levels) and all(levels)
+        if enabled == self._is_overview:
+            return
+        self._is_overview = enabled
+
+        # Fully transparent items would be left out of items() queries,
+        # items without contents are not drawn but remain selectable
+        no_contents = QtWidgets.QGraphicsItem.ItemHasNoContents
+        for node in self._nodes.values():
+            node.setFlag(no_contents, enabled)
+        for edge in self._edges_by_hash.values():
+            edge._update_visibility()
+        if self._edge_layer is not None:
+            self._edge_layer.update()
+
+    @property
+    def edge_layer(self):
+        """Return the layer drawing edges, if enabled
+
+        :rtype: :class:`nodegraph.layer.EdgeLayer`
+
+        """
+        return self._edge_layer
+
+    def set_edge_layer(self, enabled):
+        """Switch between drawing every edge on its own and drawing them
+        through a single edge layer
+
+        :param enabled: If true, use the edge layer
+        :type enabled: bool
+
+        """
+        if enabled == (self._edge_layer is not None):
+            return
+
+        if enabled:
+            self._edge_layer = EdgeLayer(self)
+        else:
+            self.removeItem(self._edge_layer)
+            self._edge_layer = None
+
+        for edge in self._edges_by_hash.values():
+            edge._update_visibility()
+
+    def _refresh_overview(self, nodes=(), edges=()):
+        """Repaint the overview layer, if any, collecting geometry of the
+        given items again when it is drawn
+
+        :param nodes: Added, removed, moved or resized nodes
+        :type nodes: list
+
+        :param edges: Hashes of added, removed or moved edges
+        :type edges: list
+
+        """
+        if self._overview is not None:
+            self._overview.invalidate(nodes, edges)
+
+    @property
+    def overlays(self):
+        """Return transient visuals drawn by views over all items, i.e. the
+        rubber band and the interactive edge
+
+        :rtype: list
+
+        """
+        return self._overlays
+
+    def add_overlay(self, overlay):
+        """Register an overlay, which must implement rect() and
+        paint(painter, lod) in scene coordinates
+
+        :param overlay: Overlay to draw
+        :type overlay: object
+
+        """
+        self._overlays.append(overlay)
+        self.update(overlay.rect())
+
+    def remove_overlay(self, overlay):
+        """Unregister an overlay
+
+        :param overlay: Registered overlay
+        :type overlay: object
+
+        """
+        if overlay in self._overlays:
+            self._overlays.remove(overlay)
+            self.update(overlay.rect())
+
+    def update_overlay(self, old_rect, new_rect):
+        """Repaint area an overlay moved across
+
+        :param old_rect: Scene rectangle covered before
+        :type old_rect: :class:`QtCore.QRectF`
+
+        :param new_rect: Scene rectangle covered now
+        :type new_rect: :class:`QtCore.QRectF`
+
+        """
+        self.update(old_rect.united(new_rect))
+
+    @property
+    def frame_scheduler(self):
+        """Return the scheduler running deferred work once per frame
+
+        :rtype: :class:`nodegraph.scheduler.FrameScheduler`
+
+        """
+        return self._frame_scheduler
+
+    @property
+    def geometry(self):
+        """Return columnar copy of node rectangles and flags, kept in sync
+        as nodes move, resize, show, hide or change selection
+
+        :returns: Store or None when numpy is not available
+        :rtype: :class:`nodegraph.geometry.NodeGeometryStore`
+
+        """
+        return self._geometry
+
+    @property
+    def style_cache(self):
+        """Return fonts, brushes and pens shared by all items
+
+        """
+        return self._style_cache
 
     @property
     def is_interactive_edge(self):
@@ -115,13 +384,45 @@ class Scene(QtWidgets.QGraphicsScene):
     def create_node(self, name, inputs=["in"], outputs=["out"], parent=None, width=160, height=130, selectable=True, movable=True):
         """Create a new node
 
+        :raises ValueError: If a node of the same name already exists
+
         """
-        node = Node(name, self, inputs=inputs, outputs=outputs, parent=parent, width=width, height=height, selectable=selectable, movable=movable)
-        self._nodes.append(node)
-        return node
+        display = {"parent": parent, "width": width, "height": height,
+                   "selectable": selectable, "movable": movable}
+        node_id = self._model.add_node(name, inputs=inputs, outputs=outputs,
+                                       data={"display": display})
+        return self._nodes_by_id[node_id]
+
+    def create_nodes(self, specs):
+        """Create many nodes at once within a single batch
+
+        :param specs:
+            Keyword arguments of :meth:`create_node` for each node, an
+            optional "pos" entry (:class:`QtCore.QPointF`) sets its position
+        :type specs: list
+
+        :returns: Created nodes, in the same order as specs
+        :rtype: list
+
+        """
+        nodes = []
+        with self.batch():
+            for spec in specs:
+                spec = dict(spec)
+                pos = spec.pop("pos", None)
+                node = self.create_node(**spec)
+                if pos is not None:
+                    node.setPos(pos)
+                nodes.append(node)
+        return nodes
 
     def update_node_name(self, node, name):
-        node.update_name(name)
+        """Rename node
+
+        :raises ValueError: If another node already uses this name
+
+        """
+        self._model.set_node_name(node.id, name)
 
     def store_target_node(self, node):
         self.target_node = node
@@ -134,15 +435,528 @@ class Scene(QtWidgets.QGraphicsScene):
         """Create a new edge
 
         """
-        edge = Edge(source, target, self, arrow=Edge.ARROW_STANDARD)
+        edge_id = self._model.add_edge(source.id, target.id)
+        return self._edges_by_hash[edge_id]
+
+    def create_edges(self, pairs):
+        """Create many edges at once within a single batch
+
+        :param pairs: (source slot, target slot) tuples
+        :type pairs: list
+
+        :returns: Created edges, in the same order as pairs
+        :rtype: list
+
+        """
+        with self.batch():
+            return [self.create_edge(source, target)
+                    for source, target in pairs]
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Group many node/edge creations or deletions in one transaction.
+
+        Scene indexing, connections_dict updates and viewport refreshes are
+        deferred until the outermost batch exits::
+
+            with scene.batch():
+                for name in names:
+                    scene.create_node(name)
+
+        """
+        self._begin_batch()
+        try:
+            yield self
+        finally:
+            self._end_batch()
+
+    @property
+    def is_batch(self):
+        """Return True while a batch is running
+
+        """
+        return self._batch_depth > 0
+
+    def _begin_batch(self):
+        """Enter batch mode, suspend item indexing and viewport updates
+
+        """
+        self._batch_depth += 1
+        if self._batch_depth > 1:
+            return
+
+        self._suspend_index()
+        for view in self.views():
+            view.viewport().setUpdatesEnabled(False)
+
+    def _end_batch(self):
+        """Commit batch once the outermost batch exits
+
+        """
+        self._batch_depth -= 1
+        if self._batch_depth > 0:
+            return
+
+        edges, self._batch_edges = self._batch_edges, {}
+        try:
+            # Apply connections of edges still alive, one failing does not
+            # prevent the others from being applied
+            errors = []
+            for edge in edges.values():
+                try:
+                    self._add_connection(edge)
+                except Exception as error:
+                    errors.append(error)
+            if errors:
+                raise errors[0]
+        finally:
+            # Rebuild index once
+            self._resume_index()
+
+            for view in self.views():
+                view.viewport().setUpdatesEnabled(True)
+            self.invalidate()
+
+    def _suspend_index(self):
+        """Stop indexing items until the matching :meth:`_resume_index`
+
+        """
+        self._index_depth += 1
+        if self._index_depth == 1:
+            self._index_method = self.itemIndexMethod()
+            self._index_bsp_depth = self.bspTreeDepth()
+            self.setItemIndexMethod(QtWidgets.QGraphicsScene.NoIndex)
+
+    def _resume_index(self):
+        """Rebuild item index once the outermost suspension ends
+
+        """
+        self._index_depth -= 1
+        if self._index_depth > 0:
+            return
+
+        method, self._index_method = self._index_method, None
+        # A new BSP index starts at the default depth, tune it afterwards
+        self.setItemIndexMethod(method)
+        if method != QtWidgets.QGraphicsScene.BspTreeIndex:
+            return
+        if self.adaptive_index:
+            self.tune_bsp_depth()
+        elif self._index_bsp_depth:
+            self.setBspTreeDepth(self._index_bsp_depth)
+
+    def tune_bsp_depth(self):
+        """Set BSP tree depth from the number of items and the extent of
+        nodes, so that leaves hold a few items even though the scene rect
+        is much larger than the graph
+
+        """
+        if self.itemIndexMethod() != QtWidgets.QGraphicsScene.BspTreeIndex:
+            return
+        self._bsp_node_count = len(self._nodes)
+        count = len(self._nodes) + len(self._edges_by_hash)
+        extent = self.get_nodes_bbox()
+        if count < BSP_ITEMS_PER_LEAF or extent.isEmpty():
+            # Let Qt decide
+            self.setBspTreeDepth(0)
+            return
+
+        scene_rect = self.sceneRect()
+        leaves = (scene_rect.width() * scene_rect.height() /
+                  (extent.width() * extent.height()) *
+                  count / float(BSP_ITEMS_PER_LEAF))
+        depth = int(math.ceil(math.log(max(leaves, 1.0), 2)))
+        depth = min(max(depth, BSP_MIN_DEPTH), BSP_MAX_DEPTH)
+        if depth != self.bspTreeDepth():
+            self.setBspTreeDepth(depth)
+
+    def _check_bsp_depth(self):
+        """Re-tune BSP tree depth whenever the node count doubled or halved
+        since last time
+
+        """
+        if not self.adaptive_index or self._index_depth:
+            return
+        count = len(self._nodes)
+        last = self._bsp_node_count
+        if count >= 2 * max(last, BSP_ITEMS_PER_LEAF) or count < last // 2:
+            self.tune_bsp_depth()
+
+    @contextlib.contextmanager
+    def selection_batch(self):
+        """Group many selection changes, selectionChanged being emitted once
+        on exit instead of once per item.
+
+        Usage::
+
+            with scene.selection_batch():
+                scene.clearSelection()
+                scene.select_items(nodes)
+
+        """
+        self._selection_depth += 1
+        if self._selection_depth == 1:
+            self._selection_blocked = self.blockSignals(True)
+        try:
+            yield
+        finally:
+            self._selection_depth -= 1
+            if not self._selection_depth:
+                self.blockSignals(self._selection_blocked)
+                if not self._selection_blocked:
+                    self.selectionChanged.emit()
+
+    @property
+    def selected_nodes(self):
+        """Return selected nodes, kept up to date as selection changes
+
+        The returned set is live and must not be modified.
+
+        :rtype: set
+
+        """
+        return self._selected_nodes
+
+    @property
+    def selected_edges(self):
+        """Return selected edges, kept up to date as selection changes
+
+        The returned set is live and must not be modified.
+
+        :rtype: set
+
+        """
+        return self._selected_edges
+
+    def _on_item_selected(self, item, selected):
+        """Track selection state change of a node or an edge
+
+        :param item: Node or edge
+        :type item: :class:`QtWidgets.QGraphicsItem`
+
+        :param selected: New selection state
+        :type selected: bool
+
+        """
+        is_node = isinstance(item, Node)
+        items = self._selected_nodes if is_node else self._selected_edges
+        if is_node and self._geometry is not None and item in self._geometry:
+            self._geometry.set_flag(item, NodeGeometryStore.SELECTED, selected)
+        if selected:
+            items.add(item)
+        else:
+            items.discard(item)
+
+    def select_items(self, items, selected=True):
+        """Select or deselect many items at once
+
+        :param items: Items to update
+        :type items: list
+
+        :param selected: New selection state
+        :type selected: bool
+
+        """
+        with self.selection_batch():
+            for item in items:
+                item.setSelected(selected)
+
+    def query_rect(self, rect, mode=QtCore.Qt.IntersectsItemShape):
+        """Return nodes and edges within a scene rectangle, as found by the
+        scene index. Edges drawn by the edge layer are included.
+
+        :param rect: Scene rectangle
+        :type rect: :class:`QtCore.QRectF`
+
+        :param mode: How items must overlap the rectangle
+        :type mode: :class:`QtCore.Qt.ItemSelectionMode`
+
+        :rtype: list
+
+        """
+        return [item for item in self.items(rect, mode)
+                if isinstance(item, (Node, Edge))]
+
+    def nodes_in_rect(self, rect):
+        """Return visible nodes whose bounding rectangle intersects a scene
+        rectangle, in one vectorized query when numpy is available
+
+        :param rect: Scene rectangle
+        :type rect: :class:`QtCore.QRectF`
+
+        :rtype: list
+
+        """
+        if self._geometry is None:
+            return [item for item in self.items(
+                        rect, QtCore.Qt.IntersectsItemBoundingRect)
+                    if isinstance(item, Node)]
+
+        return self._geometry.intersecting(rect.left(), rect.top(),
+                                           rect.right(), rect.bottom(),
+                                           NodeGeometryStore.VISIBLE)
+
+    def translate_nodes(self, nodes, dx, dy):
+        """Move many nodes by the same offset at once
+
+        With a geometry store, rectangles are offset in one vectorized call
+        and the extent and edges are updated from them, items only being
+        repositioned. Items are not indexed and views are not updated until
+        all nodes moved, edges follow on next frame.
+
+        :param nodes: Nodes to move
+        :type nodes: list
+
+        :param dx: Horizontal offset
+        :type dx: float
+
+        :param dy: Vertical offset
+        :type dy: float
+
+        """
+        store = self._geometry
+        if store is None:
+            with self.batch():
+                for node in nodes:
+                    node.moveBy(dx, dy)
+            return
+
+        nodes = list(nodes)
+        rows = store.translate(nodes, dx, dy)
+
+        # Moves are accounted for below, from the store
+        self._is_translating_nodes = True
+        try:
+            with self.batch():
+                for node in nodes:
+                    node.moveBy(dx, dy)
+        finally:
+            self._is_translating_nodes = False
+
+        visible = (store.flags[rows] & NodeGeometryStore.VISIBLE).tolist()
+        lefts = store.x[rows].tolist()
+        tops = store.y[rows].tolist()
+        rights = (store.x[rows] + store.width[rows]).tolist()
+        bottoms = (store.y[rows] + store.height[rows]).tolist()
+        for node, is_visible, left, top, right, bottom in zip(
+                nodes, visible, lefts, tops, rights, bottoms):
+            if is_visible:
+                self._node_extent.update(node, left, top, right, bottom)
+            self._moved_nodes[node] = None
+            for ahash in node.edges:
+                self._moved_edges[ahash] = None
+
+        self._frame_scheduler.schedule("moved_nodes", self._flush_moved_nodes)
+
+    def remove_edge(self, edge):
+        self._model.remove_edge(edge.id)
+
+    def on_node_added(self, node_id):
+        """Build graphic item of a node added to the model
+
+        :param node_id: Model node id
+        :type node_id: int
+
+        """
+        model = self._model  # alias
+        name = model.node_name(node_id)
+        input_ids = model.node_inputs(node_id)
+        output_ids = model.node_outputs(node_id)
+
+        node = Node(name, self,
+                    inputs=[model.slot_name(i) for i in input_ids],
+                    outputs=[model.slot_name(i) for i in output_ids],
+                    **model.node_data(node_id).get("display", {}))
+        node._id = node_id
+        for slot, slot_id in zip(node._inputs + node._outputs,
+                                 input_ids + output_ids):
+            slot._id = slot_id
+            self._slots_by_id[slot_id] = slot
+
+        self._nodes_by_id[node_id] = node
+        self._nodes[name] = node
+        self._update_node_geometry(node)
+        self._check_bsp_depth()
+
+        if self.is_overview:
+            node.setFlag(QtWidgets.QGraphicsItem.ItemHasNoContents)
+
+    def on_node_renamed(self, node_id, old_name, name):
+        """Update graphic item of a node renamed in the model
+
+        :param node_id: Model node id
+        :type node_id: int
+
+        :param old_name: Previous node name
+        :type old_name: str
+
+        :param name: New node name
+        :type name: str
+
+        """
+        node = self._nodes.pop(old_name)
+        self._nodes[name] = node
+        node.update_name(name)
+
+        # Edge tooltips will be rebuilt from the new name
+        for ahash in node.edges:
+            self._edges_by_hash[ahash].setToolTip("")
+
+    def on_node_removed(self, node_id):
+        """Remove graphic item of a node removed from the model
+
+        :param node_id: Model node id
+        :type node_id: int
+
+        """
+        node = self._nodes_by_id.pop(node_id)
+        for slot in node._inputs + node._outputs:
+            del self._slots_by_id[slot.id]
+
+        self._moved_nodes.pop(node, None)
+        self._selected_nodes.discard(node)
+        self._node_extent.remove(node)
+        if self._geometry is not None:
+            self._geometry.remove(node)
+        self._slot_grid.remove(node)
+        self.removeItem(node)
+        del self._nodes[node.name]
+        self._check_bsp_depth()
+        self._refresh_overview(nodes=[node])
+
+    def on_edge_added(self, edge_id):
+        """Build graphic item of an edge added to the model
+
+        :param edge_id: Model edge id
+        :type edge_id: int
+
+        """
+        source_id, target_id = self._model.edge_slots(edge_id)
+        edge = Edge(self._slots_by_id[source_id],
+                    self._slots_by_id[target_id],
+                    self,
+                    arrow=Edge.ARROW_STANDARD,
+                    edge_id=edge_id)
         if self.invert_new_edges:
             edge.double_click = True
-        self._edges_by_hash[edge.hash] = edge
-        self.connections_dict = self.get_connections(target)
-        return edge
+        self._edges_by_hash[edge_id] = edge
 
-    def remove_edge(self, edge):
-        del self._edges_by_hash[edge.hash]
+        if self._batch_depth:
+            self._batch_edges[edge.hash] = edge
+        else:
+            self._add_connection(edge)
+
+        if self.is_overview or self._edge_layer is not None:
+            edge._update_visibility()
+        self._refresh_overview(edges=[edge.hash])
+
+    def on_edge_removed(self, edge_id):
+        """Remove graphic item of an edge removed from the model
+
+        :param edge_id: Model edge id
+        :type edge_id: int
+
+        """
+        edge = self._edges_by_hash.pop(edge_id)
+        edge._source_slot.remove_edge(edge.hash)
+        edge._target_slot.remove_edge(edge.hash)
+        edge._update_layer()
+        self._selected_edges.discard(edge)
+        self.removeItem(edge)
+
+        if self._batch_edges.pop(edge.hash, None) is None:
+            self._remove_connection(edge)
+
+        self._refresh_overview(edges=[edge.hash])
+
+    def _resolve_channels(self, edge):
+        """Return source and target channel names of an edge as stored in
+        connections_dict and the output template
+
+        :param edge: Edge to resolve
+        :type edge: :class:`nodegraph.edge.Edge`
+
+        :rtype: tuple
+
+        """
+        source_name = edge._source_slot._name
+        target_name = edge._target_slot._name
+
+        if self.attributes:
+            return self.attributes[source_name], self.attributes[target_name]
+        elif self.convert:
+            # converts Translate X to tx
+            return self.convert(source_name), self.convert(target_name)
+        return source_name, target_name
+
+    def _add_connection(self, edge):
+        """Add the connection described by edge to connections_dict
+
+        :param edge: Newly created edge
+        :type edge: :class:`nodegraph.edge.Edge`
+
+        """
+        source, target = self._resolve_channels(edge)
+        if self.output_template is None:
+            targets = self.connections_dict.setdefault(source, [])
+            if target not in targets:
+                targets.append(target)
+        else:
+            self.output_template.add(source, target, edge.double_click)
+
+    def _remove_connection(self, edge):
+        """Remove the connection described by edge from connections_dict
+
+        :param edge: Deleted edge
+        :type edge: :class:`nodegraph.edge.Edge`
+
+        """
+        source, target = self._resolve_channels(edge)
+        if self.output_template is None:
+            targets = self.connections_dict.get(source)
+            if targets is None:
+                return
+            if target in targets:
+                targets.remove(target)
+            if not targets:
+                del self.connections_dict[source]
+        else:
+            self.output_template.remove(source, target)
+
+    def get_incoming_edges(self, slot):
+        """Return edges whose target is the given slot
+
+        :param slot: Slot to look up
+        :type slot: :class:`nodegraph.node.NodeSlot`
+
+        :rtype: list
+
+        """
+        return [self._edges_by_hash[i]
+                for i in self._model.incoming_edges(slot.id)]
+
+    def get_outgoing_edges(self, slot):
+        """Return edges whose source is the given slot
+
+        :param slot: Slot to look up
+        :type slot: :class:`nodegraph.node.NodeSlot`
+
+        :rtype: list
+
+        """
+        return [self._edges_by_hash[i]
+                for i in self._model.outgoing_edges(slot.id)]
+
+    def is_slot_connected(self, slot):
+        """Return True if any edge starts or ends on the given slot
+
+        :param slot: Slot to look up
+        :type slot: :class:`nodegraph.node.NodeSlot`
+
+        :rtype: bool
+
+        """
+        return self._model.is_slot_connected(slot.id)
 
     def add_exclusive_connection(self, source, target):
         self.only_allowed_connections.append((source,target))
@@ -154,6 +968,11 @@ class Scene(QtWidgets.QGraphicsScene):
         self._is_interactive_edge = True
 
         if not self._interactive_edge:
+            # Nodes can't move while dragging an edge, index slots once
+            self._slot_grid.clear()
+            for node in self._nodes.values():
+                self._index_slots(node)
+
             # Create interactive edge
             self._interactive_edge = InteractiveEdge(
                 source_slot,
@@ -167,6 +986,98 @@ class Scene(QtWidgets.QGraphicsScene):
             # Re-use existing interactive edge
             self._interactive_edge.refresh(mouse_pos, source_slot)
 
+    def _on_node_moved(self, node):
+        """Queue edges of a moved node, they are updated once per frame
+        however many times the node moves
+
+        :param node: Moved node
+        :type node: :class:`nodegraph.node.Node`
+
+        """
+        if self._is_translating_nodes:
+            return
+        self._moved_nodes[node] = None
+        self._update_node_geometry(node)
+        for ahash in node.edges:
+            self._moved_edges[ahash] = None
+
+        self._frame_scheduler.schedule("moved_nodes", self._flush_moved_nodes)
+
+    def _update_node_geometry(self, node):
+        """Update the contribution of a node to the extent of visible nodes
+        and its row in the geometry store
+
+        :param node: Moved, resized, shown or hidden node
+        :type node: :class:`nodegraph.node.Node`
+
+        """
+        rect = node.sceneBoundingRect()
+        visible = node.isVisible()
+        if visible:
+            self._node_extent.update(node, rect.left(), rect.top(),
+                                     rect.right(), rect.bottom())
+        else:
+            self._node_extent.remove(node)
+
+        if self._geometry is not None:
+            flags = 0
+            if visible:
+                flags |= NodeGeometryStore.VISIBLE
+            if node.isSelected():
+                flags |= NodeGeometryStore.SELECTED
+            self._geometry.update(node, rect.x(), rect.y(),
+                                  rect.width(), rect.height(), flags)
+
+        self._refresh_overview(nodes=[node])
+
+    def _flush_moved_nodes(self):
+        """Update edges and slot hot zones of nodes moved since last call
+
+        """
+        if not self._moved_nodes:
+            return
+        nodes, self._moved_nodes = self._moved_nodes, {}
+        edges, self._moved_edges = self._moved_edges, {}
+
+        for node in nodes:
+            if node in self._slot_grid:
+                self._index_slots(node)
+
+        for ahash in edges:
+            edge = self._edges_by_hash.get(ahash)
+            if edge is not None:
+                edge.follow_slots()
+
+        self._refresh_overview(nodes, edges)
+
+    def _index_slots(self, node):
+        """Add hot zones of node slots to the slot grid
+
+        :param node: Node to index
+        :type node: :class:`nodegraph.node.Node`
+
+        """
+        zones = []
+        for rect, slot in node.slot_hot_zones:
+            rect = node.mapRectToScene(rect)
+            zones.append((rect.left(), rect.top(), rect.right(), rect.bottom(),
+                          slot))
+        self._slot_grid.insert(node, zones)
+
+    def _update_hover_slot(self, slot):
+        """Highlight given slot, only clearing the previously hovered node
+
+        :param slot: Slot under the mouse or None
+        :type slot: :class:`nodegraph.node.NodeSlot`
+
+        """
+        node = slot.parent if slot else None
+        if self._hover_node is not None and self._hover_node is not node:
+            self._hover_node._update_hover_slot(False)
+        if node is not None:
+            node._update_hover_slot(slot)
+        self._hover_node = node
+
     def stop_interactive_edge(self, connect_to=None):
         """Hide the interactive and create an edge between the source slot
         and the slot given by connect_to
@@ -177,7 +1088,6 @@ class Scene(QtWidgets.QGraphicsScene):
 
         self._is_interactive_edge = False
         if connect_to:
-            eh = self._edges_by_hash  # shortcut
             source = self._interactive_edge._source_slot
 
             found = True
@@ -186,15 +1096,13 @@ class Scene(QtWidgets.QGraphicsScene):
                 # Try to find most likely slot
                 if source.family == NodeSlot.OUTPUT:
                     for slot in connect_to._inputs:
-                        li = [h for h in eh if eh[h]._source_slot == slot or
-                              eh[h]._target_slot == slot]
-                        if not li:
+                        if not self.is_slot_connected(slot):
                             connect_to = slot
                             found = True
                             break
-                        for h in eh:
-                            if eh[h]._source_slot == slot:
-                                connect_to = eh[h]
+                        outgoing = self.get_outgoing_edges(slot)
+                        if outgoing:
+                            connect_to = outgoing[-1]
                 else:
                     connect_to = connect_to._outputs[0]
                     found = True
@@ -206,7 +1114,7 @@ class Scene(QtWidgets.QGraphicsScene):
                 source = connect_to
                 target = self._interactive_edge._source_slot
 
-            existing_connects = [h for h in eh if eh[h]._target_slot == source]
+            existing_connects = self.get_incoming_edges(source)
 
             if (found and
                     source.family != target.family and
@@ -214,8 +1122,7 @@ class Scene(QtWidgets.QGraphicsScene):
 
                 # overwrite existing connection
                 if existing_connects:
-                    edge_to_delete = self.get_edge_by_hash(existing_connects[0])
-                    self.delete_edges([edge_to_delete])
+                    self.delete_edges([existing_connects[0]])
 
 
                 escape = False
@@ -262,10 +1169,10 @@ class Scene(QtWidgets.QGraphicsScene):
                     if self.invert_new_edges:
                         edge.double_click = True
 
-            self.connections_dict = self.get_connections(target)
-
-        self.removeItem(self._interactive_edge)
+        self.remove_overlay(self._interactive_edge)
         self._interactive_edge = None
+        self._update_hover_slot(None)
+        self._slot_grid.clear()
 
     def get_all_edges(self, target_node):
         hash_list = [hash for hash in target_node.parent.edges if hash in self._edges_by_hash]
@@ -292,19 +1199,7 @@ class Scene(QtWidgets.QGraphicsScene):
         for edge in to_invert:
             edge.double_click = toggle
             if self.output_template:
-                source_name = edge._source_slot._name
-                target_name = edge._target_slot._name
-
-                # check if type of input is dict or list
-
-                if self.attributes:
-                    source = self.attributes[source_name]
-                    target = self.attributes[target_name]
-                elif self.convert:
-                    # converts Translate X to tx
-                    source = self.convert(source_name)
-                    target = self.convert(target_name)
-
+                source, target = self._resolve_channels(edge)
                 self.output_template.set_invert(source, target, toggle)
 
             edge.refresh()
@@ -312,17 +1207,7 @@ class Scene(QtWidgets.QGraphicsScene):
 
     def invert_single_edge(self, edge, toggle):
         if self.output_template:
-            source_name = edge._source_slot._name
-            target_name = edge._target_slot._name
-
-            if self.attributes:
-                source = self.attributes[source_name]
-                target = self.attributes[target_name]
-            elif self.convert:
-                # converts Translate X to tx
-                source = self.convert(source_name)
-                target = self.convert(target_name)
-
+            source, target = self._resolve_channels(edge)
             self.output_template.set_invert(source, target, toggle)
 
         edge.refresh()
@@ -346,70 +1231,41 @@ class Scene(QtWidgets.QGraphicsScene):
         else:
             self.delete_all_edges(target_node.inputs[0])
 
-        self.connections_dict = self.get_connections(target_node.inputs[0])
-
 
 
     def get_connections(self, target_node):
-        connection_dict = {}
-        hash_list = [hash for hash in target_node.parent.edges if hash in self._edges_by_hash]
-        if self.output_template is None:
-            for node_hash in hash_list:
-
-                source_name = self._edges_by_hash[node_hash]._source_slot._name
-                target_name = self._edges_by_hash[node_hash]._target_slot._name
-
-                if self.attributes:
-                    source = self.attributes[source_name]
-                    target = self.attributes[target_name]
-                elif self.convert:
-                    # converts Translate X to tx
-                    source = self.convert(source_name)
-                    target = self.convert(target_name)
-
-                else:
-                    source = source_name
-                    target = target_name
-
-                if source in connection_dict:
-                    if target not in connection_dict[source]:
-                        connection_dict[source].append(target)
-
-                else:
-                    connection_dict[source] = [target]
-
-        else:
-            for node_hash in hash_list:
-
-                source_name = self._edges_by_hash[node_hash]._source_slot._name
-
-                invert_source = self._edges_by_hash[node_hash].double_click
+        """Return connections of the edges of the node owning the given
+        slot only, i.e. the per node view connections_dict used to hold.
+        connections_dict itself holds connections of every edge.
 
-                target_name = self._edges_by_hash[node_hash]._target_slot._name
+        Without output template, a new dict is returned and
+        connections_dict is left untouched. With an output template, the
+        node connections are added to it and its dict is returned.
 
+        :param target_node: Any slot of the node to evaluate
+        :type target_node: :class:`nodegraph.node.NodeSlot`
 
-                if self.attributes:
-                    source = self.attributes[source_name]
-                    target = self.attributes[target_name]
-                elif self.convert:
-                    # converts Translate X to tx
-                    source = self.convert(source_name)
-                    target = self.convert(target_name)
+        :rtype: dict
 
-                else:
-                    source = source_name
-                    target = target_name
-
-                newObj = self.output_template.add(source, target, invert_source)
+        """
+        connection_dict = {}
+        hash_list = [hash for hash in target_node.parent.edges if hash in self._edges_by_hash]
+        for node_hash in hash_list:
+            edge = self._edges_by_hash[node_hash]
+            source, target = self._resolve_channels(edge)
 
+            if self.output_template is None:
+                targets = connection_dict.setdefault(source, [])
+                if target not in targets:
+                    targets.append(target)
+            else:
+                self.output_template.add(source, target, edge.double_click)
 
+        if self.output_template is not None:
             connection_dict = self.output_template.connection_dict
 
-
         return connection_dict
 
-
-
     def start_rubber_band(self, init_pos, col=None):
         """Create/Enable custom rubber band
 
@@ -445,38 +1301,22 @@ class Scene(QtWidgets.QGraphicsScene):
         else:
             self._rubber_band.update_scene_selection(intersect)
 
-        self.removeItem(self._rubber_band)
+        self.remove_overlay(self._rubber_band)
         self._rubber_band = None
 
 
     def delete_edges(self, edges_to_delete):
         for edge in edges_to_delete:
-            self.removeItem(edge)
-            self.remove_edge(edge)
-            if self.attributes:
-                remove_source_name = self.attributes[edge._source_slot._name]
-                remove_target_name = self.attributes[edge._target_slot._name]
-            elif self.convert:
-                remove_source_name = self.convert(edge._source_slot._name)
-                remove_target_name = self.convert(edge._target_slot._name)
-
-            if self.output_template is None:
-                if remove_source_name in self.connections_dict:
-                    output_list = self.connections_dict[remove_source_name]
-                    if len(output_list) < 2:
-                        self.connections_dict.pop(remove_source_name)
-                    else:
-                        output_list.remove(remove_target_name)
-                else:
-                    continue
-            else:
-                self.output_template.remove(remove_source_name, remove_target_name)
+            # Edge may already be gone along with one of its nodes
+            if self._model.has_edge(edge.id):
+                self.remove_edge(edge)
 
 
     def delete_node(self, node):
-        self.removeItem(node)
-        index = self._nodes.index(node)
-        self._nodes.pop(index)
+        """Delete node along with all its edges
+
+        """
+        self._model.remove_node(node.id)
 
         self.redraw_scene()
 
@@ -487,42 +1327,30 @@ class Scene(QtWidgets.QGraphicsScene):
         """Delete selected nodes and edges
 
         """
-        nodes = []
-        edges = []
-        for i in self.selectedItems():
-            if isinstance(i, Node):
-                nodes.append(i)
-            if isinstance(i, Edge):
-                edges.append(i)
+        nodes = list(self._selected_nodes)
+        edges = list(self._selected_edges)
+
+        self.delete_edges(edges)
 
         for node in nodes:
-            # TODO: Collect all edges for deletion or reconnection
-
-            # Delete node(s)
-            self.removeItem(node)
-            index = self._nodes.index(node)
-            self._nodes.pop(index)
-
-        for edge in edges:
-            self.removeItem(edge)
-            self.remove_edge(edge)
-            if self.attributes:
-                remove_source_name = self.attributes[edge._source_slot._name]
-                remove_target_name = self.attributes[edge._target_slot._name]
-            elif self.convert:
-                remove_source_name = self.convert(edge._source_slot._name)
-                remove_target_name = self.convert(edge._target_slot._name)
-            output_list = self.connections_dict[remove_source_name]
+            # TODO: Reconnect edges instead of deleting them
 
-            if self.output_template is None:
-                if len(output_list) < 2:
-                    self.connections_dict.pop(remove_source_name)
-                else:
-                    output_list.remove(remove_target_name)
+            # Delete node(s) and their edges
+            self._model.remove_node(node.id)
 
-            else:
-                self.output_template.remove(remove_source_name, remove_target_name)
 
+    def event(self, event):
+        """Re-implements event to keep paint resources in sync with palette
+
+        :param event: Scene event
+        :type event: :class:`QtCore.QEvent`
+
+        """
+        if event.type() == QtCore.QEvent.PaletteChange:
+            self._style_cache.invalidate()
+            self.update()
+
+        return QtWidgets.QGraphicsScene.event(self, event)
 
     def keyPressEvent(self, event):
         if event.key() == QtCore.Qt.Key_Escape:
@@ -556,15 +1384,15 @@ class Scene(QtWidgets.QGraphicsScene):
                     # Mouse is above scene items and single click with modfiers
                     event.accept()
 
+                    items = self.items(event.scenePos())
                     if self._is_shift_key and self._is_ctrl_key:
-                        for item in self.items(event.scenePos()):
-                            item.setSelected(not item.isSelected())
+                        with self.selection_batch():
+                            for item in items:
+                                item.setSelected(not item.isSelected())
                     elif self._is_shift_key:
-                        for item in self.items(event.scenePos()):
-                            item.setSelected(True)
+                        self.select_items(items)
                     elif self._is_ctrl_key:
-                        for item in self.items(event.scenePos()):
-                            item.setSelected(False)
+                        self.select_items(items, False)
 
                     return
         else:
@@ -591,68 +1419,209 @@ class Scene(QtWidgets.QGraphicsScene):
         test = True
         if buttons == QtCore.Qt.LeftButton or test == True:
 
+            # Large selections are dragged as a single group
+            if self._move_group is None and self._is_group_move(event):
+                self._start_group_move(event)
+
+            # Dragged nodes and their edges move together once per frame
+            if self._move_group is not None or self._is_node_drag(event):
+                if self._drag_pos is None:
+                    self._drag_applied_pos = event.buttonDownScenePos(
+                        QtCore.Qt.LeftButton)
+                self._drag_pos = event.scenePos()
+                self._frame_scheduler.schedule("drag_nodes",
+                                               self._apply_node_drag)
+                return
+
             QtWidgets.QGraphicsScene.mouseMoveEvent(self, event)
-            sceneMouse = event.scenePos() + QtCore.QPointF(-150, 0)
-            node = None
+            self._mouse_pos = event.scenePos()
             # Edge creation mode?
             if self._is_interactive_edge:
-                slot = None
-
-                for item in self.items(event.scenePos()):
-                    if isinstance(item, Node):
-                        node = item
-                        slot = node._hover_slot
-                        break
-
-                if node:
-                    left_margin = PySide2.QtCore.QMarginsF((node.label_rect_size[0]*1.7) , 0, 0, 0)
-
-                    right_margin = PySide2.QtCore.QMarginsF(0, 0, node.label_rect_size[0] / 2, 0)
-
-                    his = [i for i in node._inputs if (i._rect + right_margin).contains(sceneMouse)]
-                    hos = [i for i in node._outputs if (i._rect + left_margin).contains(event.scenePos())]
-
-                    if hos:
-                        node._update_hover_slot(hos[0])
-                    elif his:
-                        node._update_hover_slot(his[0])
-                    else:
-                        node._update_hover_slot(False)
-
-
-                else:
-                    for node in self._nodes:
-                        node._update_hover_slot(False)
-
-
-                self._interactive_edge.refresh(event.scenePos())
+                self._frame_scheduler.schedule(
+                    "interactive_edge", self._refresh_interactive_edge)
 
             # Selection mode?
             elif self._is_rubber_band:
-                self._rubber_band.refresh(event.scenePos())
-            elif self.selectedItems():
-                if not self._is_refresh_edges:
-                    self._is_refresh_edges = True
-                    self._refresh_edges = self._get_refresh_edges()
-                for ahash in self._refresh_edges["move"]:
-                    if ahash in self._edges_by_hash:
-                        self._edges_by_hash[ahash].refresh_position()
-                for ahash in self._refresh_edges["refresh"]:
-                    if ahash in self._edges_by_hash:
-                        self._edges_by_hash[ahash].refresh()
+                self._frame_scheduler.schedule(
+                    "rubber_band", self._refresh_rubber_band)
         elif buttons == QtCore.Qt.RightButton:
             QtWidgets.QGraphicsScene.mouseMoveEvent(self, event)
-            sceneMouse = event.scenePos() + QtCore.QPointF(-150, 0)
+            self._mouse_pos = event.scenePos()
 
             # Edge creation mode?
             if self._is_interactive_edge:
-                self._interactive_edge.refresh(event.scenePos())
+                self._frame_scheduler.schedule(
+                    "interactive_edge", self._refresh_interactive_edge)
             # Selection mode?
             elif self._is_rubber_band:
-                self._rubber_band.refresh(event.scenePos())
+                self._frame_scheduler.schedule(
+                    "rubber_band", self._refresh_rubber_band)
         else:
             return QtWidgets.QGraphicsScene.mouseMoveEvent(self, event)
 
+    def _is_node_drag(self, event):
+        """Return True if the mouse event drags nodes, which is then done by
+        the scene instead of the base item implementation
+
+        """
+        if (event.buttons() != QtCore.Qt.LeftButton or
+                self._is_interactive_edge or self._is_rubber_band):
+            return False
+
+        grabber = self.mouseGrabberItem()
+        return (isinstance(grabber, Node) and
+                bool(grabber.flags() & QtWidgets.QGraphicsItem.ItemIsMovable))
+
+    def _apply_node_drag(self):
+        """Move dragged nodes, or their group, to the last known mouse
+        position then make their edges follow
+
+        """
+        pos = self._drag_pos
+        if pos is None:
+            return
+
+        if self._move_group is not None:
+            self._move_group.setPos(pos - self._move_group_origin)
+            self._refresh_group_edges()
+            return
+
+        delta = pos - self._drag_applied_pos
+        self._drag_applied_pos = pos
+        grabber = self.mouseGrabberItem()
+        if delta.isNull() or not isinstance(grabber, Node):
+            return
+
+        # Same items as the base implementation, selection or grabber
+        movable = QtWidgets.QGraphicsItem.ItemIsMovable
+        nodes = [grabber]
+        if grabber.isSelected():
+            nodes = list(self._selected_nodes)
+        for node in nodes:
+            if node.flags() & movable:
+                node.moveBy(delta.x(), delta.y())
+
+        self._frame_scheduler.cancel("moved_nodes")
+        self._flush_moved_nodes()
+
+    def _is_group_move(self, event):
+        """Return True if the mouse event drags enough selected nodes to move
+        them as a group
+
+        """
+        if (event.buttons() != QtCore.Qt.LeftButton or
+                self._is_interactive_edge or self._is_rubber_band):
+            return False
+
+        grabber = self.mouseGrabberItem()
+        if not isinstance(grabber, Node) or not grabber.isSelected():
+            return False
+
+        return len(self._selected_nodes) >= GROUP_MOVE_THRESHOLD
+
+    def _start_group_move(self, event):
+        """Gather selected nodes and the edges between them in an item group
+        translated as a whole, each item being drawn from a device cache
+
+        :param event: Mouse event starting the drag
+        :type event: :class:`QtWidgets.QGraphicsSceneMouseEvent`
+
+        """
+        movable = QtWidgets.QGraphicsItem.ItemIsMovable
+        nodes = [node for node in self._selected_nodes
+                 if node.flags() & movable]
+        grouped = set(nodes)
+
+        # Edges between grouped nodes move along, others are refreshed
+        inner_edges = []
+        boundary_edges = []
+        hashes = set()
+        for node in nodes:
+            hashes |= node.edges
+        for ahash in hashes:
+            edge = self._edges_by_hash.get(ahash)
+            if edge is None:
+                continue
+            source, target = edge.slots
+            if source.parent in grouped and target.parent in grouped:
+                inner_edges.append(edge)
+            else:
+                boundary_edges.append(edge)
+
+        # Moving the group would update the index entry of every item
+        self._is_move_group_indexed = not self.adaptive_index
+        if not self._is_move_group_indexed:
+            self._suspend_index()
+
+        items = nodes + inner_edges
+        self._move_group = self.createItemGroup(items)
+        self._move_group_origin = event.buttonDownScenePos(
+            QtCore.Qt.LeftButton)
+        self._move_group_edges = boundary_edges
+
+        cache = QtWidgets.QGraphicsItem.DeviceCoordinateCache
+        for item in items:
+            item.setCacheMode(cache)
+        for edge in inner_edges:
+            edge._update_visibility()
+
+    def _refresh_group_edges(self):
+        """Make edges crossing the moved group boundary follow it
+
+        """
+        if self._move_group is None:
+            return
+        for edge in self._move_group_edges:
+            edge.refresh()
+
+        if self._overview is not None:
+            items = self._move_group.childItems()
+            edges = [edge.hash for edge in self._move_group_edges]
+            edges.extend(item.hash for item in items
+                         if isinstance(item, Edge))
+            self._refresh_overview(
+                [item for item in items if isinstance(item, Node)], edges)
+
+    def _stop_group_move(self):
+        """Dissolve the moved group, its items keeping their scene position
+
+        """
+        group = self._move_group
+        if group is None:
+            return
+        self._move_group = None
+        self._move_group_edges = []
+
+        # Reparenting moves nodes, which queues their edges for update
+        items = group.childItems()
+        self.destroyItemGroup(group)
+
+        for item in items:
+            item.setCacheMode(QtWidgets.QGraphicsItem.NoCache)
+            if isinstance(item, Edge):
+                item._update_visibility()
+
+        # Settle edges, then rebuild index once
+        self._frame_scheduler.flush()
+        if not self._is_move_group_indexed:
+            self._resume_index()
+
+    def _refresh_interactive_edge(self):
+        """Make interactive edge follow the last known mouse position
+
+        """
+        if self._is_interactive_edge:
+            pos = self._mouse_pos
+            self._update_hover_slot(self._slot_grid.query(pos.x(), pos.y()))
+            self._interactive_edge.refresh(pos)
+
+    def _refresh_rubber_band(self):
+        """Make rubber band follow the last known mouse position
+
+        """
+        if self._is_rubber_band:
+            self._rubber_band.refresh(self._mouse_pos)
+
     def mouseReleaseEvent(self, event):
         """Re-implements mouse release event
 
@@ -660,6 +1629,12 @@ class Scene(QtWidgets.QGraphicsScene):
         :type event: :class:`QtWidgets.QMouseEvent`
 
         """
+        # Catch up with moves not processed yet
+        self._mouse_pos = event.scenePos()
+        self._frame_scheduler.flush()
+        self._drag_pos = None
+        self._drag_applied_pos = None
+        self._stop_group_move()
 
         selected = self.items(event.scenePos())
 
@@ -678,34 +1653,13 @@ class Scene(QtWidgets.QGraphicsScene):
                     break
             connect_to = node
             if not connect_to:
-                for node in self._nodes:
-                    node._update_hover_slot(False)
+                self._update_hover_slot(None)
                 # self.stop_interactive_edge()
                 return
 
-            target_node = None
-            release_mode = False
-            if hasattr(connect_to,'_inputs'):
-                for input in connect_to._inputs:
-                    sceneMouse = event.scenePos() - connect_to.mapToScene(event.pos())
-                    label_size = connect_to.label_rect_size[0]
-                    right_margin = PySide2.QtCore.QMarginsF(0, 0, label_size, 0)
-                    end_zone = input._rect + right_margin
-                    if end_zone.contains(sceneMouse):
-                        target_node = input
-                        release_mode = True
-            if hasattr(connect_to,'_outputs'):
-                left_margin = PySide2.QtCore.QMarginsF(connect_to.label_rect_size[0] / 2, 0, 0, 0)
-                for output in connect_to._outputs:
-                    sceneMouse = event.scenePos() - connect_to.mapToScene(event.pos())
-                    label_size = connect_to.label_rect_size[0]
-                    end_zone = output._rect + left_margin
-                    if end_zone.contains(sceneMouse):
-                        target_node = output
-                        release_mode = True
-
-            else:
-                pass
+            target_node = connect_to.slot_at(
+                connect_to.mapFromScene(event.scenePos()))
+            release_mode = target_node is not None
 
             # change between modes
             # if you realize that you're over a valid node, set draw_line to be true (but then you have to fix it after)
@@ -724,11 +1678,6 @@ class Scene(QtWidgets.QGraphicsScene):
                     self.stop_interactive_edge(connect_to=target_node)
 
 
-        # Edge refresh mode?
-        if self._is_refresh_edges:
-            self._is_refresh_edges = False
-            self._refresh_edges = {"move": [], "refresh": []}
-
         # Rubber band mode?
         if self._is_rubber_band:
             self.stop_rubber_band()
@@ -748,17 +1697,7 @@ class Scene(QtWidgets.QGraphicsScene):
             if isinstance(selected[0], Edge):
                 selected[0].set_double_click(not selected[0].double_click)
                 if self.output_template:
-                    source_name = selected[0]._source_slot._name
-                    target_name = selected[0]._target_slot._name
-
-                    if self.attributes:
-                        source = self.attributes[source_name]
-                        target = self.attributes[target_name]
-                    elif self.convert:
-                        # converts Translate X to tx
-                        source = self.convert(source_name)
-                        target = self.convert(target_name)
-
+                    source, target = self._resolve_channels(selected[0])
                     self.output_template.toggle_invert(source, target)
             elif isinstance(selected[0], Node):
                 if self.clicked_node:
@@ -772,33 +1711,7 @@ class Scene(QtWidgets.QGraphicsScene):
         """Re-inplements selection changed event
 
         """
-        if self._is_refresh_edges:
-            self._refresh_edges = self._get_refresh_edges()
-
-    def _get_refresh_edges(self):
-        """Return all edges of selected items
-
-        """
-        edges = set()
-        nodes = set()
-        edges_to_move = []
-        edges_to_refresh = []
-
-        for item in self.selectedItems():
-            if isinstance(item, Node):
-                edges |= item.edges
-                nodes.add(item.name)
-
-        # Distinghish edges where both ends are selected from the rest
-        for edge in edges:
-            # check if edge is in edges by hash. If it's not do not proceed!
-            if edge in self._edges_by_hash and self._edges_by_hash[edge].is_connected_to(nodes):
-                edges_to_move.append(edge)
-            else:
-                edges_to_refresh.append(edge)
-
-        r = {"move": edges_to_move, "refresh": edges_to_refresh}
-        return r
+        self._refresh_overview()
 
     def toggle_connection_clicked(self):
         self.draw_line = not self.draw_line
@@ -806,8 +1719,8 @@ class Scene(QtWidgets.QGraphicsScene):
     def get_nodes_bbox(self, visible_only=True):
         """Return bounding box of all nodes in scene
 
-        ..todo :
-            This function could be refactored
+        The extent of visible nodes is maintained as nodes move, so that
+        it is returned without visiting any node.
 
         :param visible_only: If true, only evaluate visible NodeSlot
         :type visible_only: bool
@@ -816,6 +1729,14 @@ class Scene(QtWidgets.QGraphicsScene):
         :rtype: :class:`QtCore.QrectF`
 
         """
+        if visible_only:
+            bounds = self._node_extent.bounds()
+            if bounds is None:
+                return QtCore.QRectF()
+            left, top, right, bottom = bounds
+            return QtCore.QRectF(QtCore.QPointF(left, top),
+                                 QtCore.QPointF(right, bottom))
+
         if not self._nodes:
             return QtCore.QRectF()
 
@@ -828,7 +1749,7 @@ class Scene(QtWidgets.QGraphicsScene):
         max_x_node = None
         max_y_node = None
 
-        for node in self._nodes:
+        for node in self._nodes.values():
             if visible_only and not node.isVisible():
                 continue
 
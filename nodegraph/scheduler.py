@@ -0,0 +1,83 @@
+# =============================================================================
+# Nodegraph-pyqt
+#
+# Everyone is permitted to copy and distribute verbatim copies of this
+# document, but changing it is not allowed without permissions.
+#
+# For any questions, please contact: dsideb@gmail.com
+#
+# GNU LESSER GENERAL PUBLIC LICENSE (Version 3, 29 June 2007)
+# =============================================================================
+
+"""
+Deferred work scheduling including:
+
+    * FrameScheduler
+
+"""
+
+from Qt import QtCore
+
+
+class FrameScheduler(QtCore.QObject):
+
+    """
+    Run scheduled callbacks at most once per display frame
+
+    Callbacks are scheduled under a key, scheduling again under the same
+    key before the frame is due replaces the previous callback. Callbacks
+    should read the latest state (i.e. mouse position) when they run.
+
+    """
+
+    def __init__(self, parent=None, interval=16):
+        """Create an instance of this class
+
+        :param parent: Owner of the scheduler
+        :type parent: :class:`QtCore.QObject`
+
+        :param interval: Minimum time between two frames in milliseconds
+        :type interval: int
+
+        """
+        QtCore.QObject.__init__(self, parent)
+        self._tasks = {}  # key -> callback, in scheduling order
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self.flush)
+
+    def schedule(self, key, callback):
+        """Run a callback on next frame
+
+        :param key: Identifies the work, only the last callback scheduled
+            under a key is run
+        :type key: str
+
+        :param callback: Function called without arguments
+        :type callback: callable
+
+        """
+        self._tasks[key] = callback
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def cancel(self, key):
+        """Drop the callback scheduled under a key, if any
+
+        :param key: Key used to schedule the work
+        :type key: str
+
+        """
+        self._tasks.pop(key, None)
+
+    def flush(self):
+        """Run all scheduled callbacks now
+
+        """
+        self._timer.stop()
+        while self._tasks:
+            tasks, self._tasks = self._tasks, {}
+            for callback in tasks.values():
+                callback()
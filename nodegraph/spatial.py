@@ -0,0 +1,231 @@
+# =============================================================================
+# Nodegraph-pyqt
+#
+# Everyone is permitted to copy and distribute verbatim copies of this
+# document, but changing it is not allowed without permissions.
+#
+# For any questions, please contact: dsideb@gmail.com
+#
+# GNU LESSER GENERAL PUBLIC LICENSE (Version 3, 29 June 2007)
+# =============================================================================
+
+"""
+Spatial indexes used in Node graph including:
+
+    * SlotGrid
+    * ExtentTracker
+
+"""
+import heapq
+import itertools
+
+
+class SlotGrid(object):
+
+    """
+    Uniform grid of slot hot zones in scene coordinates
+
+    Zones are registered per node so that a node can be re-indexed on its
+    own. A point query only looks at the zones of a single cell. Any owner
+    and payload can be used, i.e. the edge layer indexes edge rectangles.
+
+    """
+
+    def __init__(self, cell_size=256):
+        """Create an instance of this class
+
+        :param cell_size: Width and height of a grid cell in scene units
+        :type cell_size: float
+
+        """
+        self._cell_size = float(cell_size)
+        self._cells = {}  # (column, row) -> zones
+        self._nodes = {}  # node -> [(column, row), zone]
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __contains__(self, node):
+        return node in self._nodes
+
+    def _cell_range(self, left, top, right, bottom):
+        """Return keys of all cells overlapped by a rectangle
+
+        """
+        size = self._cell_size
+        for column in range(int(left // size), int(right // size) + 1):
+            for row in range(int(top // size), int(bottom // size) + 1):
+                yield (column, row)
+
+    def insert(self, node, zones):
+        """Index hot zones of a node, replacing any previous ones
+
+        :param node: Owner of the zones
+        :type node: :class:`nodegraph.node.Node`
+
+        :param zones: (left, top, right, bottom, slot) tuples
+        :type zones: list
+
+        """
+        self.remove(node)
+
+        entries = []
+        for zone in zones:
+            for key in self._cell_range(*zone[:4]):
+                self._cells.setdefault(key, []).append(zone)
+                entries.append((key, zone))
+        self._nodes[node] = entries
+
+    def remove(self, node):
+        """Remove all hot zones of a node
+
+        :param node: Owner of the zones
+        :type node: :class:`nodegraph.node.Node`
+
+        """
+        for key, zone in self._nodes.pop(node, ()):
+            cell = self._cells[key]
+            cell.remove(zone)
+            if not cell:
+                del self._cells[key]
+
+    def clear(self):
+        """Remove all zones
+
+        """
+        self._cells = {}
+        self._nodes = {}
+
+    def query(self, x, y):
+        """Return slot whose hot zone contains the given point
+
+        :param x: Scene x coordinate
+        :type x: float
+
+        :param y: Scene y coordinate
+        :type y: float
+
+        :returns: A slot or None
+        :rtype: :class:`nodegraph.node.NodeSlot`
+
+        """
+        size = self._cell_size
+        cell = self._cells.get((int(x // size), int(y // size)))
+        if not cell:
+            return None
+
+        for left, top, right, bottom, slot in cell:
+            if left <= x <= right and top <= y <= bottom:
+                return slot
+        return None
+
+    def query_rect(self, left, top, right, bottom):
+        """Return payloads of all zones intersecting a rectangle
+
+        :returns: Payloads, each one listed once
+        :rtype: list
+
+        """
+        found = {}  # used as an ordered set
+        cells = self._cells
+        for key in self._cell_range(left, top, right, bottom):
+            for zone in cells.get(key, ()):
+                if (zone[0] <= right and zone[2] >= left and
+                        zone[1] <= bottom and zone[3] >= top):
+                    found[zone[4]] = None
+        return list(found)
+
+
+class ExtentTracker(object):
+
+    """
+    Bounding box of many rectangles kept up to date as they are added,
+    moved or removed
+
+    Each side is the top of a heap. Replaced or removed rectangles are left
+    in the heaps and skipped when they surface, heaps being rebuilt once
+    they hold too many of those.
+
+    """
+
+    def __init__(self):
+        """Create an instance of this class
+
+        """
+        self._rects = {}  # key -> (serial, left, top, right, bottom)
+        self._heaps = ([], [], [], [])  # left, top, -right, -bottom
+        self._serials = itertools.count()
+
+    def __len__(self):
+        return len(self._rects)
+
+    def __contains__(self, key):
+        return key in self._rects
+
+    def update(self, key, left, top, right, bottom):
+        """Add or replace the rectangle of a key
+
+        :param key: Owner of the rectangle, i.e. a node
+        :type key: object
+
+        """
+        serial = next(self._serials)
+        self._rects[key] = (serial, left, top, right, bottom)
+        for heap, value in zip(self._heaps, (left, top, -right, -bottom)):
+            heapq.heappush(heap, (value, serial, key))
+
+        if len(self._heaps[0]) > 2 * len(self._rects) + 64:
+            self._rebuild()
+
+    def remove(self, key):
+        """Remove the rectangle of a key, if any
+
+        :param key: Owner of the rectangle
+        :type key: object
+
+        """
+        self._rects.pop(key, None)
+
+    def clear(self):
+        """Remove all rectangles
+
+        """
+        self._rects = {}
+        self._heaps = ([], [], [], [])
+
+    def _rebuild(self):
+        """Rebuild heaps from live rectangles only
+
+        """
+        heaps = ([], [], [], [])
+        for key, (serial, left, top, right, bottom) in self._rects.items():
+            for heap, value in zip(heaps, (left, top, -right, -bottom)):
+                heap.append((value, serial, key))
+        for heap in heaps:
+            heapq.heapify(heap)
+        self._heaps = heaps
+
+    def _top(self, heap):
+        """Return value at the top of a heap, dropping stale entries
+
+        """
+        rects = self._rects
+        while heap:
+            value, serial, key = heap[0]
+            rect = rects.get(key)
+            if rect is not None and rect[0] == serial:
+                return value
+            heapq.heappop(heap)
+        return None
+
+    def bounds(self):
+        """Return bounding box of all rectangles
+
+        :returns: (left, top, right, bottom) or None if empty
+        :rtype: tuple
+
+        """
+        if not self._rects:
+            return None
+        left, top, right, bottom = [self._top(heap) for heap in self._heaps]
+        return (left, top, -right, -bottom)
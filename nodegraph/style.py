@@ -0,0 +1,134 @@
+# =============================================================================
+# Nodegraph-pyqt
+#
+# Everyone is permitted to copy and distribute verbatim copies of this
+# document, but changing it is not allowed without permissions.
+#
+# For any questions, please contact: dsideb@gmail.com
+#
+# GNU LESSER GENERAL PUBLIC LICENSE (Version 3, 29 June 2007)
+# =============================================================================
+
+"""
+Paint resources shared by all items of a scene
+
+"""
+
+from Qt import QtGui
+
+
+class StyleCache(object):
+
+    """
+    Fonts, brushes and pens used by node graph items, built once per scene
+    palette instead of on every paint call
+
+    """
+
+    # Pens are cached per width, which follows the zoom level
+    MAX_PENS = 256
+
+    def __init__(self, scene):
+        """Create an instance of this class
+
+        :param scene: Scene whose palette drives brushes, see
+            :meth:`from_palette` when there is none
+        :type scene: :class:`nodegraph.scene.Scene`
+
+        """
+        self._scene = scene
+        self._palette = None  # used when there is no scene
+        self._generation = 0
+        self._brushes = None
+        self._pens = {}
+
+        self.title_font = QtGui.QFont("Arial", 14)
+        self.title_font.setStyleStrategy(QtGui.QFont.ForceOutline)
+        self.slot_font = QtGui.QFont("Arial", 11)
+        self.slot_font.setStyleStrategy(QtGui.QFont.ForceOutline)
+
+    @classmethod
+    def from_palette(cls, palette):
+        """Return resources built from a fixed palette, for items painted
+        outside of any scene
+
+        :param palette: Palette driving brushes
+        :type palette: :class:`QtGui.QPalette`
+
+        :rtype: :class:`nodegraph.style.StyleCache`
+
+        """
+        style = cls(None)
+        style._palette = palette
+        return style
+
+    @property
+    def generation(self):
+        """Return a number that changes whenever resources are invalidated,
+        to be used in keys of anything painted with them
+
+        """
+        return self._generation
+
+    def invalidate(self):
+        """Drop palette dependent resources, they are rebuilt on next use
+
+        """
+        self._generation += 1
+        self._brushes = None
+        self._pens = {}
+
+    def _build(self):
+        """Build brushes from current scene palette
+
+        """
+        palette = (self._scene.palette() if self._scene is not None
+                   else self._palette)
+        text = palette.text()
+        label = QtGui.QColor(90, 90, 140)
+        invert = QtGui.QColor(255, 0, 0)
+
+        self._brushes = {
+            "button": palette.button(),
+            "button_text": palette.buttonText(),
+            "text": text,
+            "text_hover": QtGui.QBrush(text.color().darker(250)),
+            "highlight": palette.highlight(),
+            "highlighted_text": palette.highlightedText(),
+            "label": QtGui.QBrush(label),
+            "invert": QtGui.QBrush(invert),
+            "invert_selected": QtGui.QBrush(invert.darker(250)),
+        }
+
+    def brush(self, role):
+        """Return brush of given role
+
+        :param role: Brush role, i.e. "text" or "highlight"
+        :type role: str
+
+        :rtype: :class:`QtGui.QBrush`
+
+        """
+        if self._brushes is None:
+            self._build()
+        return self._brushes[role]
+
+    def pen(self, role, width=1):
+        """Return solid pen of given role and width
+
+        :param role: Brush role, see :meth:`brush`
+        :type role: str
+
+        :param width: Pen width
+        :type width: float
+
+        :rtype: :class:`QtGui.QPen`
+
+        """
+        key = (role, width)
+        pen = self._pens.get(key)
+        if pen is None:
+            if len(self._pens) >= self.MAX_PENS:
+                self._pens = {}
+            pen = self._pens[key] = QtGui.QPen(self.brush(role), width)
+        return pen
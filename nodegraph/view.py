@@ -19,7 +19,7 @@ from Qt import QtCore, QtGui, QtWidgets
 # from . import QtOpenGL
 
 from .node import Node
-from .constant import SCENE_WIDTH, SCENE_HEIGHT
+from .constant import SCENE_WIDTH, SCENE_HEIGHT, OVERVIEW_LOD
 
 RESOURCES = os.path.dirname(os.path.realpath(__file__))
 
@@ -46,6 +46,7 @@ class View(QtWidgets.QGraphicsView):
         """
         QtWidgets.QGraphicsView.__init__(self, scene, parent)
         self._last_mouse_pos = QtCore.QPoint(0, 0)
+        self._pan_mouse_pos = None
         self._width = SCENE_WIDTH
         self._height = SCENE_HEIGHT
         self._scale = scale
@@ -108,12 +109,11 @@ class View(QtWidgets.QGraphicsView):
 
         """
         # Resolve rectangle we want to zoom to
-        selection = self.scene().selectedItems()
+        selection = self.scene().selected_nodes
         if selected and selection:
             scene_rect = self._get_selection_bbox(selection)
         else:
-            scene_rect = self.scene().itemsBoundingRect()
-            # scene_rect = self.scene().get_nodes_bbox()
+            scene_rect = self.scene().get_nodes_bbox()
 
         # Add a bit of padding
         scene_rect.adjust(-padding, -padding, padding, padding)
@@ -156,6 +156,8 @@ class View(QtWidgets.QGraphicsView):
             # PySide2.QtCore.QPointF(65.000000, 154.700000)
             # self.setAlignment(QtCore.Qt.AlignTop | QtCore.Qt.AlignLeft)
 
+        self._update_overview()
+
     # def scale_center_view(self, scale_factor, selected=False, padding=50):
     #     """Set view transform in order to fit all/selected nodes in scene.
     #
@@ -185,6 +187,29 @@ class View(QtWidgets.QGraphicsView):
     #     self.scale_view(new_scale, limits=False)
     #     self.centerOn(scene_rect.center())
 
+    def drawForeground(self, painter, rect):
+        """Re-implement drawForeground to draw scene overlays
+
+        :param painter: View painter, in scene coordinates
+        :type painter: :class:`QtGui.QPainter`
+
+        :param rect: Exposed scene rectangle
+        :type rect: :class:`QtCore.QRectF`
+
+        """
+        QtWidgets.QGraphicsView.drawForeground(self, painter, rect)
+
+        scene = self.scene()
+        if scene is None:
+            return
+
+        lod = self.transform().m11()
+        for overlay in scene.overlays:
+            if overlay.rect().intersects(rect):
+                painter.save()
+                overlay.paint(painter, lod)
+                painter.restore()
+
     def translate_view(self, offset):
         """Translate view by the given offset
 
@@ -213,6 +238,7 @@ class View(QtWidgets.QGraphicsView):
             if new_scale >= 1.0:
                 self._scale = 1
                 self.resetTransform()
+                self._update_overview()
                 return False
             elif new_scale < 0.1:
                 scale_factor = new_scale = 0.1
@@ -223,8 +249,25 @@ class View(QtWidgets.QGraphicsView):
         self.setInteractive(False)
         self.scale(scale_factor, scale_factor)
         self.setInteractive(True)
+        self._update_overview()
         return True
 
+    @property
+    def is_overview(self):
+        """Return True if zoomed out below the overview level of detail, the
+        scene then being drawn through its overview layer
+
+        """
+        return self.transform().m11() < OVERVIEW_LOD
+
+    def _update_overview(self):
+        """Let the scene follow the zoom level of this view
+
+        """
+        scene = self.scene()
+        if scene is not None:
+            scene.update_overview()
+
     def keyPressEvent(self, event):
         """Re-implement keyPressEvent from base class
 
@@ -283,15 +326,13 @@ class View(QtWidgets.QGraphicsView):
                      n.boundingRect().center())
 
         if event.text() in ['o']:
-            for node in self.scene().selectedItems():
-                if isinstance(node, Node):
-                    node._height -= 10
-                    node.refresh()
+            for node in list(self.scene().selected_nodes):
+                node._height -= 10
+                node.refresh()
         if event.text() in ['p']:
-            for node in self.scene().selectedItems():
-                if isinstance(node, Node):
-                    node._height += 10
-                    node.refresh()
+            for node in list(self.scene().selected_nodes):
+                node._height += 10
+                node.refresh()
         if event.text() in ['s']:
             print(self._scale)
         else:
@@ -368,16 +409,28 @@ class View(QtWidgets.QGraphicsView):
 
         """
         if self._is_pan:
-            delta = (self.mapToScene(self._last_mouse_pos) -
-                     self.mapToScene(event.pos()))
+            # Pan once per frame to the last known mouse position
+            self._pan_mouse_pos = event.pos()
             self.setCursor(QtCore.Qt.ClosedHandCursor)
-            self.translate_view(delta)
-            self._last_mouse_pos = event.pos()
+            self.scene().frame_scheduler.schedule(
+                "pan_%d" % id(self), self._pan_to_mouse)
         else:
             self._last_mouse_pos = event.pos()
             QtWidgets.QGraphicsView.mouseMoveEvent(self, event)
 
 
+    def _pan_to_mouse(self):
+        """Translate view by the mouse offset since last pan
+
+        """
+        if self._pan_mouse_pos is None:
+            return
+        delta = (self.mapToScene(self._last_mouse_pos) -
+                 self.mapToScene(self._pan_mouse_pos))
+        self.translate_view(delta)
+        self._last_mouse_pos = self._pan_mouse_pos
+        self._pan_mouse_pos = None
+
     def mouseReleaseEvent(self, event):
         """Re-implement mouseReleaseEvent from base class
 
@@ -388,6 +441,10 @@ class View(QtWidgets.QGraphicsView):
         # print("MOUSE RELEASE")
         scene = self.scene()  # alias
 
+        # Catch up with moves not processed yet
+        if self._is_pan:
+            self._pan_to_mouse()
+
         # Update registars
         self._last_mouse_pos = event.pos()
         if event.button() == QtCore.Qt.LeftButton:
@@ -0,0 +1,88 @@
+"""
+Headless graph model tests
+
+"""
+import pytest
+
+from nodegraph.model import GraphModel
+
+
+class Recorder(object):
+
+    """
+    Observer recording every notification it receives
+
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def on_node_added(self, node_id):
+        self.calls.append(("on_node_added", node_id))
+
+    def on_node_removed(self, node_id):
+        self.calls.append(("on_node_removed", node_id))
+
+    def on_node_renamed(self, node_id, old_name, name):
+        self.calls.append(("on_node_renamed", node_id, old_name, name))
+
+    def on_edge_added(self, edge_id):
+        self.calls.append(("on_edge_added", edge_id))
+
+    def on_edge_removed(self, edge_id):
+        self.calls.append(("on_edge_removed", edge_id))
+
+
+def test_rename_notifies_observers():
+    model = GraphModel()
+    recorder = Recorder()
+    model.add_observer(recorder)
+    node_id = model.add_node("a")
+
+    model.set_node_name(node_id, "b")
+
+    assert recorder.calls[-1] == ("on_node_renamed", node_id, "a", "b")
+    assert model.node_name(node_id) == "b"
+    assert model.find_node("b") == node_id
+    assert model.find_node("a") is None
+
+
+def test_rename_to_same_name_does_not_notify():
+    model = GraphModel()
+    recorder = Recorder()
+    node_id = model.add_node("a")
+    model.add_observer(recorder)
+
+    model.set_node_name(node_id, "a")
+
+    assert recorder.calls == []
+
+
+def test_duplicate_names_are_rejected():
+    model = GraphModel()
+    recorder = Recorder()
+    model.add_observer(recorder)
+    model.add_node("a")
+    node_id = model.add_node("b")
+    del recorder.calls[:]
+
+    with pytest.raises(ValueError):
+        model.add_node("a")
+    with pytest.raises(ValueError):
+        model.set_node_name(node_id, "a")
+
+    assert recorder.calls == []
+    assert len(model.nodes) == 2
+
+
+def test_removing_unknown_ids_does_not_notify():
+    model = GraphModel()
+    recorder = Recorder()
+    model.add_observer(recorder)
+
+    with pytest.raises(KeyError):
+        model.remove_node(42)
+    with pytest.raises(KeyError):
+        model.remove_edge(42)
+
+    assert recorder.calls == []
@@ -0,0 +1,53 @@
+"""
+Scene tests, skipped when Qt bindings are not available
+
+"""
+import pytest
+
+pytest.importorskip("PySide2")
+pytest.importorskip("maya")
+
+from Qt import QtWidgets  # noqa: E402
+from nodegraph.scene import Scene  # noqa: E402
+from nodegraph.view import View  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return (QtWidgets.QApplication.instance() or
+            QtWidgets.QApplication([]))
+
+
+def test_batch_recovers_from_failing_connection(app):
+    scene = Scene()
+    view = View(scene)
+    source = scene.create_node("source", outputs=["x", "y"])
+    target = scene.create_node("target", inputs=["x", "y"])
+
+    add_connection = scene._add_connection
+
+    def failing_add_connection(edge):
+        if edge.slots[0].name == "x":
+            raise ValueError("bad connection")
+        add_connection(edge)
+
+    scene._add_connection = failing_add_connection
+    with pytest.raises(ValueError):
+        scene.create_edges([(source.outputs[0], target.inputs[0]),
+                            (source.outputs[1], target.inputs[1])])
+
+    assert not scene.is_batch
+    assert scene.itemIndexMethod() == QtWidgets.QGraphicsScene.BspTreeIndex
+    assert view.viewport().updatesEnabled()
+    # Other edges of the batch are still applied
+    assert scene.connections_dict == {"y": ["y"]}
+
+
+def test_model_rename_updates_scene(app):
+    scene = Scene()
+    node = scene.create_node("a")
+
+    scene.model.set_node_name(node.id, "b")
+
+    assert node.name == "b"
+    assert scene.node("b") is node